@@ -0,0 +1,69 @@
+# N adventure calls over a few scripts, run as one `piratespeak run` process per
+# call against a single `piratespeak batch` process, which imports the engine and
+# parses each script once and keeps compiled adventures warm between calls.
+#
+#   python benchmarks/bench_batch.py [calls] [scripts]
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+COMMAND = [sys.executable, os.path.join(ROOT, 'piratespeak')]
+
+PROGRAM = '''
+ship Ledger%d {
+    allHands adventure balance(coin n) {
+        treasure coin total;
+        total = 0;
+        sail (i = 0; i < n; i = i + 1) {
+            explore (i / 3 > n / 4) { total = total - i; } deviate { total = total + i * 2; }
+        }
+        return total;
+    }
+}
+'''
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    scripts = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    n = 2000
+    with tempfile.TemporaryDirectory() as directory:
+        jobs = []
+        for index in range(scripts):
+            path = os.path.join(directory, f'ledger{index}.ps')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(PROGRAM % index)
+            jobs.append(path)
+        jobs = [(jobs[i % scripts], f'Ledger{i % scripts}.balance', str(n)) for i in range(calls)]
+        print(f'{calls} calls of balance({n}) over {scripts} scripts')
+
+        start = time.perf_counter()
+        expected = [subprocess.run(COMMAND + ['run', *job], capture_output=True, text=True, check=True).stdout
+                    for job in jobs]
+        separate = time.perf_counter() - start
+        print(f'{"one process per call:":24}{separate * 1000:9.1f} ms')
+
+        job_file = os.path.join(directory, 'jobs.txt')
+        with open(job_file, 'w', encoding='utf-8') as f:
+            f.writelines(' '.join(job) + '\n' for job in jobs)
+        report_file = os.path.join(directory, 'report.json')
+        start = time.perf_counter()
+        output = subprocess.run(COMMAND + ['batch', job_file, '--json', report_file], capture_output=True, text=True,
+                                check=True).stdout
+        batch = time.perf_counter() - start
+        assert output == ''.join(expected), output
+        with open(report_file, encoding='utf-8') as f:
+            report = json.load(f)
+        print(f'{"one batch process:":24}{batch * 1000:9.1f} ms ({separate / batch:4.1f}x)')
+        print(f'  imports {report["startup"]["imports"] * 1000:.1f} ms, '
+              f'loads {sum(s["load_seconds"] for s in report["scripts"]) * 1000:.1f} ms, '
+              f'runs {sum(s["run_seconds"] for s in report["scripts"]) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
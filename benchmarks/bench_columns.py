@@ -0,0 +1,70 @@
+# One formula over a dataset: pl_eval per record (symbols substituted row by
+# row) against pl_eval_columns on in-memory arrays and chunked over a
+# memory-mapped .npy directory. Needs NumPy.
+#
+#   python benchmarks/bench_columns.py [rows] [chunk rows]
+
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+FORMULA = '(? (and (gt price 40) (lt qty 7)) (* price (- 1 (/ discount 100))) (+ (* price qty) (- 0 discount)))'
+
+
+def load_calculator():
+    spec = importlib.util.spec_from_file_location('sexpr_calculator', os.path.join(ROOT, 'sexpr-calculator.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bind(node, row):
+    if isinstance(node, str):
+        return ['val', row[node]] if node in row else node
+    if len(node) == 2 and node[0] == 'val':
+        return node
+    return [node[0]] + [bind(arg, row) for arg in node[1:]]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    chunk = int(sys.argv[2]) if len(sys.argv) > 2 else 65536
+    sx = load_calculator()
+    formula = sx.pl_parse(FORMULA)
+    rng = np.random.default_rng(7)
+    columns = {'price': rng.uniform(1, 100, rows), 'qty': rng.integers(0, 12, rows),
+               'discount': rng.integers(0, 30, rows)}
+    print(f'{rows} rows')
+
+    start = time.perf_counter()
+    names = list(columns)
+    lists = [columns[name].tolist() for name in names]
+    expected = [sx.pl_eval(bind(formula, dict(zip(names, values)))) for values in zip(*lists)]
+    per_row = time.perf_counter() - start
+    print(f'{"pl_eval per row:":38}{per_row * 1000:9.1f} ms')
+
+    start = time.perf_counter()
+    result = sx.pl_eval_columns(formula, columns)
+    whole = time.perf_counter() - start
+    assert np.allclose(result, expected)
+    print(f'{"columns, in memory:":38}{whole * 1000:9.1f} ms ({per_row / whole:6.0f}x)')
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, column in columns.items():
+            np.save(os.path.join(directory, name + '.npy'), column)
+        start = time.perf_counter()
+        result = sx.pl_eval_columns(formula, directory, chunk_size=chunk, out=os.path.join(directory, 'result.npy'))
+        chunked = time.perf_counter() - start
+        assert np.allclose(result, expected)
+        del result
+        print(f'{f"columns, mmap, {chunk} rows per chunk:":38}{chunked * 1000:9.1f} ms ({per_row / chunked:6.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
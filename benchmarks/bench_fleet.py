@@ -0,0 +1,130 @@
+# A CPU-bound fleet loop against the same body in a serial sail loop, with
+# 1, 2, 4, ... worker processes up to the core count. The heavy work sits in an
+# adventure the body calls, so each worker compiles it like the serial run does.
+# Both loops also build a scroll with a `haul sum`, so the check covers scroll sums.
+# A fleet body that refers to adventures workers cannot take is checked to run in place.
+#
+#   python benchmarks/bench_fleet.py [iterations] [inner]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PirateSpeak import Interpreter, Lexer, Parser
+
+PROGRAM = '''
+ship Survey {
+    allHands treasure scroll log;
+
+    allHands adventure depth(coin i, coin inner) {
+        treasure coin x;
+        treasure coin j;
+        x = 0;
+        sail (j = 0; j < inner; j = j + 1) {
+            explore (x > 1000000) { x = x - i * j; } deviate { x = x + i * 3 - j; }
+        }
+        return x;
+    }
+
+    allHands adventure serial(coin n, coin inner) {
+        treasure coin total;
+        treasure coin deepest;
+        treasure scroll trail;
+        total = 0;
+        deepest = 0;
+        trail = "";
+        sail (i = 0; i < n; i = i + 1) {
+            treasure coin d;
+            d = depth(i, inner);
+            total = total + d;
+            deepest = max(deepest, d);
+            explore (d > 1000000) { trail = trail + "^"; } deviate { trail = trail + "."; }
+        }
+        log = trail;
+        return total + deepest;
+    }
+
+    allHands adventure parallel(coin n, coin inner) {
+        treasure coin total;
+        treasure coin deepest;
+        treasure scroll trail;
+        total = 0;
+        deepest = 0;
+        trail = "";
+        fleet sail (i = 0; i < n; i = i + 1) haul sum total, max deepest, sum trail {
+            treasure coin d;
+            d = depth(i, inner);
+            total = total + d;
+            deepest = max(deepest, d);
+            explore (d > 1000000) { trail = trail + "^"; } deviate { trail = trail + "."; }
+        }
+        log = trail;
+        return total + deepest;
+    }
+}
+'''
+
+# refers to a broken adventure and a charted one that is not pure, without calling them
+STRANDED = '''
+ship Harbour {
+    allHands treasure coin gold;
+    allHands adventure broken() { return ( ; }
+    allHands charted adventure greedy(coin n) { return gold + n; }
+    allHands adventure double(coin i) { return i * 2; }
+    allHands adventure moor(coin n) {
+        treasure coin total;
+        total = 0;
+        fleet sail (i = 0; i < n; i = i + 1) haul sum total {
+            explore (i > n) { total = total + (broken() + greedy(i)); }
+            total = total + double(i);
+        }
+        return total;
+    }
+}
+'''
+
+
+def check_in_place():
+    interpreter = Interpreter(Parser(Lexer(STRANDED).get_tokens(), lazy=True), fleet_workers=2)
+    interpreter.interpret()
+    assert interpreter.execute_method('Harbour', 'moor', [100]) == 9900
+    assert interpreter.fleet_executor is None
+
+
+def run(adventure, workers, n, inner):
+    interpreter = Interpreter(Parser(Lexer(PROGRAM).get_tokens()), background_compile=False, fleet_workers=workers)
+    interpreter.interpret()
+    interpreter.execute_method('Survey', adventure, [workers * 4, inner])  # start the pool, warm the workers
+    start = time.perf_counter()
+    result = interpreter.execute_method('Survey', adventure, [n, inner])
+    elapsed = time.perf_counter() - start
+    result = (result, str(interpreter.ships['Survey'][0]))  # log
+    if interpreter.fleet_executor is not None:
+        interpreter.fleet_executor.shutdown()
+    return result, elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    inner = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    cores = os.cpu_count() or 1
+    expected, serial = run('serial', 1, n, inner)
+    print(f'{n} iterations x {inner} inner steps, {cores} cores')
+    print(f'sail:              {serial * 1000:8.1f} ms')
+    # At least two workers, so the chunked path is checked even on one core
+    most = max(cores, 2)
+    workers = 1
+    while True:
+        result, elapsed = run('parallel', workers, n, inner)
+        assert result == expected, (result, expected)
+        print(f'fleet, {workers:2d} workers: {elapsed * 1000:8.1f} ms ({serial / elapsed:4.1f}x)')
+        if workers >= most:
+            break
+        workers = min(workers * 2, most)
+    check_in_place()
+
+
+if __name__ == '__main__':
+    main()
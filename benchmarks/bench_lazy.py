@@ -0,0 +1,78 @@
+# Program load time and memory with eager and lazy adventure bodies, on a
+# large script where only one adventure runs. Also checks that a lazy body with a
+# syntax error fails the same way on every call.
+#
+#   python benchmarks/bench_lazy.py [adventures] [statements]
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PirateSpeak import Interpreter, Lexer, Parser
+
+BROKEN = '''
+ship Wreck {
+    allHands adventure broken() { this is not ( valid }
+    allHands adventure afloat() { return 1; }
+}
+'''
+
+
+def make_program(adventures, statements):
+    lines = ['ship Armada {', '    allHands treasure coin gold;']
+    for n in range(adventures):
+        lines.append(f'    allHands adventure plunder{n}(coin a) {{')
+        for _ in range(statements):
+            lines.append('        explore (a > gold) { gold = gold + a * 2 - 1; } deviate { gold = gold - 1; }')
+        lines.append('        return gold;')
+        lines.append('    }')
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def load(tokens, lazy):
+    tracemalloc.start()
+    start = time.perf_counter()
+    interpreter = Interpreter(Parser(tokens, lazy=lazy))
+    interpreter.interpret()
+    load_time = time.perf_counter() - start
+    interpreter.ships['Armada'][0] = 0  # gold
+    start = time.perf_counter()
+    interpreter.execute_method('Armada', 'plunder0', [5])
+    call_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return load_time, call_time, peak
+
+
+def check_broken():
+    interpreter = Interpreter(Parser(Lexer(BROKEN).get_tokens(), lazy=True))
+    interpreter.interpret()
+    errors = []
+    for _ in range(2):
+        try:
+            interpreter.execute_method('Wreck', 'broken', [])
+        except SyntaxError as e:
+            errors.append(str(e))
+    assert len(errors) == 2 and errors[0] == errors[1], errors
+    assert interpreter.execute_method('Wreck', 'afloat', []) == 1
+
+
+def main():
+    adventures = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    tokens = Lexer(make_program(adventures, statements)).get_tokens()
+    print(f'{len(tokens)} tokens, {adventures} adventures, 1 executed')
+    for lazy in (False, True):
+        load_time, call_time, peak = load(tokens, lazy)
+        label = 'lazy ' if lazy else 'eager'
+        print(f'{label}: load {load_time * 1000:8.2f} ms, first call {call_time * 1000:6.2f} ms, '
+              f'peak {peak / 1024:8.0f} KiB')
+    check_broken()
+
+
+if __name__ == '__main__':
+    main()
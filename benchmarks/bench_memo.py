@@ -0,0 +1,94 @@
+# Repeated calls to pure adventures with and without memo tables: a charted
+# adventure with overlapping subproblems, and an unmarked one proven pure and
+# called with a small set of arguments. Also checks that turning memoization on
+# never changes what a lazily parsed program does.
+#
+#   python benchmarks/bench_memo.py [grid] [rounds] [memo limit]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PirateSpeak import Interpreter, Lexer, Parser
+
+PROGRAM = '''
+ship Cartographer {
+    allHands charted adventure routes(coin east, coin south) {
+        explore (east == 0 || south == 0) { return 1; }
+        return routes(east - 1, south) + routes(east, south - 1);
+    }
+
+    allHands adventure distance(coin leg) {
+        treasure coin total;
+        total = 0;
+        sail (i = 0; i < 200; i = i + 1) { total = total + leg * i; }
+        return total;
+    }
+
+    allHands adventure voyage(coin rounds) {
+        treasure coin total;
+        total = 0;
+        sail (r = 0; r < rounds; r = r + 1) {
+            sail (leg = 0; leg < 16; leg = leg + 1) { total = total + distance(leg); }
+        }
+        return total;
+    }
+}
+'''
+
+# Adventures that refer to a broken one and to a charted one that is not pure,
+# without calling them for small arguments
+UNCALLED = '''
+ship Lookout {
+    allHands treasure coin gold;
+    allHands adventure broken() { return ( ; }
+    allHands charted adventure greedy(coin n) { return gold + n; }
+    allHands adventure spot(coin n) { explore (n > 5) { return broken(); } return n + 1; }
+    allHands adventure sight(coin n) { explore (n > 5) { return greedy(n); } return n + 2; }
+}
+'''
+
+
+def check_uncalled():
+    results = []
+    for memoize in (None, 'pure'):
+        interpreter = Interpreter(Parser(Lexer(UNCALLED).get_tokens(), lazy=True), memoize=memoize)
+        interpreter.interpret()
+        results.append([interpreter.execute_method('Lookout', name, [1]) for name in ('spot', 'sight')])
+    assert results[0] == results[1] == [2, 3], results
+
+
+def run(memoize, grid, rounds, limit):
+    interpreter = Interpreter(Parser(Lexer(PROGRAM).get_tokens()), memoize=memoize, memo_limit=limit,
+                              background_compile=False)
+    interpreter.interpret()
+    start = time.perf_counter()
+    routes = interpreter.execute_method('Cartographer', 'routes', [grid, grid])
+    routes_time = time.perf_counter() - start
+    start = time.perf_counter()
+    voyage = interpreter.execute_method('Cartographer', 'voyage', [rounds])
+    voyage_time = time.perf_counter() - start
+    return (routes, voyage), routes_time, voyage_time, interpreter.memo_stats()
+
+
+def main():
+    grid = int(sys.argv[1]) if len(sys.argv) > 1 else 11
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 1024
+    print(f'routes({grid}, {grid}), voyage({rounds}), memo limit {limit}')
+    results = None
+    for memoize in (None, 'pure'):
+        values, routes_time, voyage_time, stats = run(memoize, grid, rounds, limit)
+        assert results is None or values == results, (values, results)
+        results = values
+        print(f'memoize={memoize!s:5}: routes {routes_time * 1000:8.1f} ms, voyage {voyage_time * 1000:8.1f} ms')
+        for entry in stats:
+            print(f"    {entry['adventure']:9} {entry['hits']:6} hits {entry['misses']:6} misses "
+                  f"{entry['evictions']:6} evicted, hit rate {entry['hit_rate']:.1%}")
+    check_uncalled()
+
+
+if __name__ == '__main__':
+    main()
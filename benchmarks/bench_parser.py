@@ -0,0 +1,138 @@
+# Compares the binding-power expression parser against the original
+# eight-level recursive descent chain on expression-heavy PirateSpeak code.
+#
+#   python benchmarks/bench_parser.py [adventures] [statements] [repeat]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PirateSpeak import Lexer, Parser
+
+
+class DescentParser(Parser):
+    # The chain Parser.parse_expression used to go through, kept as the baseline
+
+    def parse_expression(self):
+        return self.parse_assignment()
+
+    def parse_assignment(self):
+        left = self.parse_logical_or()
+        if self.current_token[0] == 'OPERATOR' and self.current_token[1] == '=':
+            self.eat('OPERATOR')
+            right = self.parse_expression()
+            return {'type': 'assignment', 'left': left, 'right': right}
+        return left
+
+    def parse_logical_or(self):
+        left = self.parse_logical_and()
+        while self.current_token[0] == 'OPERATOR' and self.current_token[1] == '||':
+            self.eat('OPERATOR')
+            right = self.parse_logical_and()
+            left = {'type': 'logical_or', 'left': left, 'right': right}
+        return left
+
+    def parse_logical_and(self):
+        left = self.parse_equality()
+        while self.current_token[0] == 'OPERATOR' and self.current_token[1] == '&&':
+            self.eat('OPERATOR')
+            right = self.parse_equality()
+            left = {'type': 'logical_and', 'left': left, 'right': right}
+        return left
+
+    def parse_equality(self):
+        left = self.parse_comparison()
+        while self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('==', '!='):
+            op = self.current_token[1]
+            self.eat('OPERATOR')
+            right = self.parse_comparison()
+            left = {'type': 'equality', 'operator': op, 'left': left, 'right': right}
+        return left
+
+    def parse_comparison(self):
+        left = self.parse_term()
+        while self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('<', '>', '<=', '>='):
+            op = self.current_token[1]
+            self.eat('OPERATOR')
+            right = self.parse_term()
+            left = {'type': 'comparison', 'operator': op, 'left': left, 'right': right}
+        return left
+
+    def parse_term(self):
+        left = self.parse_factor()
+        while self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('+', '-'):
+            op = self.current_token[1]
+            self.eat('OPERATOR')
+            right = self.parse_factor()
+            left = {'type': 'term', 'operator': op, 'left': left, 'right': right}
+        return left
+
+    def parse_factor(self):
+        left = self.parse_unary()
+        while self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('*', '/'):
+            op = self.current_token[1]
+            self.eat('OPERATOR')
+            right = self.parse_unary()
+            left = {'type': 'factor', 'operator': op, 'left': left, 'right': right}
+        return left
+
+    def parse_unary(self):
+        if self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('!', '-'):
+            op = self.current_token[1]
+            self.eat('OPERATOR')
+            expr = self.parse_unary()
+            return {'type': 'unary', 'operator': op, 'expression': expr}
+        return self.parse_primary()
+
+
+STATEMENTS = [
+    'x = a * b + c * d - e / f;',
+    'ok = x >= 10 && y < 20 || !done;',
+    'total = total + (price * count - discount) / 2;',
+    'explore (a == b || c != d && e <= f) { y = -x * 3; }',
+    'z = 1;',
+    'w = "pieces of eight";',
+]
+
+
+def make_program(adventures, statements):
+    lines = ['ship Benchmark {', '    allHands treasure coin total;']
+    for n in range(adventures):
+        lines.append(f'    allHands adventure plunder{n}(coin a, coin b) {{')
+        for i in range(statements):
+            lines.append('        ' + STATEMENTS[i % len(STATEMENTS)])
+        lines.append('    }')
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def best_of(parser_class, tokens, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ast = parser_class(tokens).parse()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, ast
+
+
+def main():
+    adventures = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    tokens = Lexer(make_program(adventures, statements)).get_tokens()
+    descent_time, descent_ast = best_of(DescentParser, tokens, repeat)
+    pratt_time, pratt_ast = best_of(Parser, tokens, repeat)
+    if descent_ast != pratt_ast:
+        raise SystemExit('binding-power parser produced a different AST')
+
+    print(f'{len(tokens)} tokens, best of {repeat}')
+    print(f'recursive descent: {descent_time * 1000:8.2f} ms')
+    print(f'binding power:     {pratt_time * 1000:8.2f} ms  ({descent_time / pratt_time:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# Loads a generated multi-file project serially, in parallel and from the
+# per-file cache.
+#
+#   python benchmarks/bench_project.py [files] [adventures per file]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from project import Project, parse_file
+
+SHIP = '''ship Ship{n} {{
+    allHands treasure coin gold;
+{adventures}
+}}
+'''
+
+ADVENTURE = '''    allHands adventure plunder{i}(coin a, coin b) {{
+        gold = gold + a * b - (a + b) / 2;
+        explore (gold > 100 && a != b) {{ gold = gold - 1; }} deviate {{ gold = gold + 1; }}
+    }}'''
+
+
+def make_project(root, files, adventures):
+    for n in range(files):
+        body = '\n'.join(ADVENTURE.format(i=i) for i in range(adventures))
+        with open(os.path.join(root, f'ship{n:04d}.ps'), 'w') as f:
+            f.write(SHIP.format(n=n, adventures=body))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    adventures = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as root:
+        make_project(root, files, adventures)
+        largest = max((os.path.join(root, name) for name in os.listdir(root)), key=os.path.getsize)
+
+        largest_time, _ = timed(lambda: parse_file(largest))
+        serial_time, _ = timed(lambda: Project(root, workers=1).parse())
+        with Project(root) as project:
+            parallel_time, program = timed(project.parse)
+            warm_time, _ = timed(project.parse)
+
+    print(f'{files} files, {len(program)} ships, {os.cpu_count()} cpus')
+    print(f'largest file:   {largest_time * 1000:8.2f} ms')
+    print(f'serial load:    {serial_time * 1000:8.2f} ms')
+    print(f'parallel load:  {parallel_time * 1000:8.2f} ms')
+    print(f'cached reload:  {warm_time * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# Building a long scroll with `log = log + "..."` in a sail loop, with ropes
+# against plain string concatenation (Rope.MIN_LENGTH raised out of reach), in
+# the tree walker and in the compiled tier.
+#
+#   python benchmarks/bench_rope.py [appends]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PirateSpeak import Interpreter, Lexer, Parser, Rope
+
+PROGRAM = '''
+ship Logbook {
+    allHands treasure scroll log;
+
+    allHands adventure record(coin n) {
+        sail (i = 0; i < n; i = i + 1) {
+            log = log + "aye, ";
+        }
+        return log;
+    }
+}
+'''
+
+
+def run(appends, threshold):
+    interpreter = Interpreter(Parser(Lexer(PROGRAM).get_tokens()), tier_threshold=threshold,
+                              background_compile=False)
+    interpreter.interpret()
+    interpreter.ships['Logbook'][0] = ''  # log
+    if threshold is not None:
+        for _ in range(threshold + 1):
+            interpreter.execute_method('Logbook', 'record', [1])  # tier up before timing
+    interpreter.ships['Logbook'][0] = ''  # log
+    start = time.perf_counter()
+    log = interpreter.execute_method('Logbook', 'record', [appends])
+    elapsed = time.perf_counter() - start
+    assert len(log) == appends * 5
+    return elapsed
+
+
+def main():
+    appends = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    min_length = Rope.MIN_LENGTH
+    print(f'{appends} appends')
+    for label, threshold in (('tree walker', None), ('compiled   ', 1)):
+        Rope.MIN_LENGTH = float('inf')
+        plain = run(appends, threshold)
+        Rope.MIN_LENGTH = min_length
+        rope = run(appends, threshold)
+        print(f'{label}: str {plain * 1000:9.1f} ms, rope {rope * 1000:9.1f} ms ({plain / rope:5.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# Memory per ship instance with fixed field layouts, compared with keeping
+# one dict per ship as the symbol table used to.
+#
+#   python benchmarks/bench_ships.py [ships] [fields]
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PirateSpeak import Interpreter, Lexer, Parser
+
+
+def make_program(fields):
+    treasure = '\n'.join(f'    allHands treasure coin field{i};' for i in range(fields))
+    return f'''
+ship Cargo {{
+{treasure}
+}}
+
+ship Harbour {{
+    allHands adventure launch(coin n) {{
+        treasure loot cargo;
+        sail (i = 0; i < n; i = i + 1) {{
+            cargo = Cargo();
+            cargo.field0 = i;
+        }}
+        return cargo;
+    }}
+}}
+'''
+
+
+def measure(make, count):
+    tracemalloc.start()
+    ships = [make() for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ships
+    return size / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    fields = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    interpreter = Interpreter(Parser(Lexer(make_program(fields)).get_tokens()))
+    interpreter.interpret()
+    layout = interpreter.symbol_table['Cargo']
+
+    per_layout = measure(layout.instantiate, count)
+    per_dict = measure(lambda: dict.fromkeys(layout.fields), count)
+    print(f'{count} ships with {fields} treasure each')
+    print(f'fixed layout: {per_layout:6.1f} bytes per ship')
+    print(f'dict per ship: {per_dict:6.1f} bytes per ship')
+
+    start = time.perf_counter()
+    interpreter.execute_method('Harbour', 'launch', [count])
+    print(f'launching {count} ships from PirateSpeak: {time.perf_counter() - start:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Deep tail recursion, direct and mutual, in the tree walker and the compiled
+# tier. Tail calls run in invoke's loop, so the depth reached is bounded by
+# nothing; the same sum written without a tail call is shown for contrast.
+#
+#   python benchmarks/bench_tail.py [max depth]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PirateSpeak import Interpreter, Lexer, Parser
+
+PROGRAM = '''
+ship Abyss {
+    allHands adventure sink(coin n, coin acc) {
+        explore (n == 0) { return acc; }
+        return sink(n - 1, acc + n);
+    }
+
+    allHands adventure ebb(coin n) {
+        explore (n == 0) { return aye; }
+        return flow(n - 1);
+    }
+
+    allHands adventure flow(coin n) {
+        explore (n == 0) { return nay; }
+        return ebb(n - 1);
+    }
+
+    allHands adventure plain(coin n) {
+        explore (n == 0) { return 0; }
+        return n + plain(n - 1);
+    }
+}
+'''
+
+
+def run(interpreter, adventure, args):
+    start = time.perf_counter()
+    try:
+        result = interpreter.execute_method('Abyss', adventure, args)
+    except RecursionError:
+        result = 'RecursionError'
+    return result, time.perf_counter() - start
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for label, threshold in (('tree walker', None), ('tiered', 100)):
+        interpreter = Interpreter(Parser(Lexer(PROGRAM).get_tokens()), tier_threshold=threshold,
+                                  background_compile=False, memoize=None)
+        interpreter.interpret()
+        run(interpreter, 'sink', [threshold or 1, 0])  # tier up before timing
+        run(interpreter, 'ebb', [threshold or 1])
+        print(label)
+        depth = 1000
+        while depth <= limit:
+            sink, sink_time = run(interpreter, 'sink', [depth, 0])
+            ebb, ebb_time = run(interpreter, 'ebb', [depth])
+            plain, _ = run(interpreter, 'plain', [depth])
+            print(f'  depth {depth:8}: sink {sink_time * 1000:8.1f} ms, ebb/flow {ebb_time * 1000:8.1f} ms, '
+                  f'results {sink} {ebb}; without a tail call: {plain}')
+            depth *= 10
+        print(f'  peak frame depth {interpreter.metrics.peak_frame_depth}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# One frozen program run by 1, 2, 4, ... threads at once, each through its own
+# Execution. Total work grows with the thread count, so on a free-threaded build
+# the wall time should stay flat; with the GIL it grows linearly.
+#
+#   python benchmarks/bench_threads.py [max threads] [runs per thread]
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PirateSpeak import Interpreter, Lexer, Parser
+from metrics import Metrics
+
+PROGRAM = '''
+ship Crate {
+    allHands treasure coin gold;
+    allHands adventure weigh() { return gold * 2; }
+}
+
+ship Barrel {
+    allHands treasure coin rum;
+    allHands treasure coin gold;
+    allHands adventure weigh() { return gold + rum; }
+}
+
+ship Quartermaster {
+    allHands treasure coin tally;
+
+    allHands adventure fib(coin n) {
+        explore (n < 2) { return n; }
+        return fib(n - 1) + fib(n - 2);
+    }
+
+    allHands adventure stow(coin n) {
+        treasure coin total;
+        treasure scroll log;
+        total = 0;
+        log = "";
+        sail (i = 0; i < n; i = i + 1) {
+            treasure coin box;
+            explore (i / 2 > n / 4) { box = Crate(); } deviate { box = Barrel(); box.rum = i; }
+            box.gold = i;
+            total = total + box.weigh();
+            log = log + "x";
+            tally = tally + 1;
+        }
+        return total + fib(15);
+    }
+}
+'''
+
+
+def run_threads(program, threads, runs, n):
+    executions = [program.execution() for _ in range(threads)]
+    results = [None] * threads
+
+    def work(index):
+        execution = executions[index]
+        results[index] = [execution.execute_method('Quartermaster', 'stow', [n]) for _ in range(runs)]
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    metrics = Metrics.combined(execution.metrics for execution in executions)
+    tallies = [execution.ships['Quartermaster'][0] for execution in executions]
+    return results, elapsed, metrics, tallies
+
+
+def main():
+    max_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    n = 2000
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'{runs} runs of stow({n}) per thread, {os.cpu_count()} cores, GIL {"enabled" if gil else "disabled"}')
+
+    program = Interpreter(Parser(Lexer(PROGRAM).get_tokens()), memoize=None)
+    program.interpret()
+    program.ships['Quartermaster'][0] = 0  # tally
+    program.freeze()
+    expected, _, _, _ = run_threads(program, 1, 2, n)  # warm up: tier up the hot adventures
+    program.wait_for_compiles()
+    expected = expected[0][0]
+
+    threads = 1
+    base = None
+    while threads <= max_threads:
+        results, elapsed, metrics, tallies = run_threads(program, threads, runs, n)
+        assert all(value == expected for result in results for value in result), results
+        assert tallies == [runs * n] * threads, tallies
+        base = base or elapsed
+        print(f'{threads:2d} threads: {elapsed * 1000:8.1f} ms, {threads * runs / elapsed:7.1f} runs/s, '
+              f'{base * threads / elapsed:4.1f}x throughput, {metrics.calls} calls')
+        threads *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Steady-state speed of the tree walker against tiered execution, where hot
+# adventures are compiled in the background and swapped in on their next call.
+#
+#   python benchmarks/bench_tiers.py [fib n] [loop n] [threshold]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PirateSpeak import Interpreter, Lexer, Parser
+
+PROGRAM = '''
+ship Navigator {
+    allHands treasure coin steps;
+
+    allHands adventure fib(coin n) {
+        explore (n < 2) { return n; }
+        return fib(n - 1) + fib(n - 2);
+    }
+
+    allHands adventure chart(coin n) {
+        treasure coin total;
+        total = 0;
+        sail (i = 0; i < n; i = i + 1) {
+            explore (i / 3 > 2 && i != 7) { total = total + i * 2; } deviate { total = total - 1; }
+            steps = steps + 1;
+        }
+        return total;
+    }
+}
+'''
+
+
+def run(threshold, fib_n, loop_n):
+    interpreter = Interpreter(Parser(Lexer(PROGRAM).get_tokens()), tier_threshold=threshold, memoize=None)
+    interpreter.interpret()
+    interpreter.ships['Navigator'][0] = 0  # steps
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        interpreter.execute_method('Navigator', 'fib', [fib_n])
+        interpreter.execute_method('Navigator', 'chart', [loop_n])
+        timings.append(time.perf_counter() - start)
+        interpreter.wait_for_compiles()
+    return timings, interpreter.tier_stats()
+
+
+def main():
+    fib_n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    loop_n = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    threshold = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    walker, _ = run(None, fib_n, loop_n)
+    tiered, stats = run(threshold, fib_n, loop_n)
+    print(f'fib({fib_n}) + {loop_n}-iteration loop, three rounds')
+    print('tree walker: ' + '  '.join(f'{t * 1000:8.1f} ms' for t in walker))
+    print('tiered:      ' + '  '.join(f'{t * 1000:8.1f} ms' for t in tiered))
+    for event in stats['events']:
+        print(f"  tier-up {event['ship']}.{event['adventure']} on {event['reason']} "
+              f"after {event['calls']} calls / {event['backedges']} back-edges, "
+              f"compiled in {event['compile_time'] * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
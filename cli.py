@@ -0,0 +1,228 @@
+# The piratespeak command: runs adventures from PirateSpeak scripts. Batch mode runs
+# many scripts and calls in one process, so the engine is imported once and every
+# script is lexed, parsed and (once hot) compiled once, however many of its
+# adventures the batch calls.
+#
+#   piratespeak run treasure.ps BlackPearl.count 10
+#   piratespeak batch jobs.txt --timings --json report.json
+#
+# A batch file ('-' reads stdin) has one job per line:
+#   treasure.ps BlackPearl.count 10
+#   treasure.ps BlackPearl.hail "Jack Sparrow" aye
+#   other.ps                                  (only loads the script)
+# Blank lines and # comments are skipped. Arguments are coins (whole numbers), aye/nay,
+# or scrolls (anything else; quote them to keep spaces). Ships keep their treasure
+# between calls to the same script, as they would within one program.
+
+import time
+
+START = time.perf_counter()
+
+# Imported after START, so the report can show what startup costs
+import argparse
+import json
+import os
+import re
+import shlex
+import sys
+
+from metrics import Metrics
+from PirateSpeak import Interpreter, Lexer, Parser
+
+IMPORT_SECONDS = time.perf_counter() - START
+
+COIN = re.compile(r'-?\d+')  # a coin literal as the lexer reads it, negated or not
+
+
+def parse_argument(text):
+    if COIN.fullmatch(text):
+        return int(text)
+    if text in ('aye', 'nay'):
+        return text == 'aye'
+    return text
+
+
+class Script:
+    def __init__(self, path):
+        self.path = path
+        self.key = None  # (mtime, size) of the loaded source
+        self.interpreter = None
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.calls = 0
+        self.run_seconds = 0.0
+        self.errors = 0
+
+    def report(self):
+        return {'path': self.path, 'loads': self.loads, 'load_seconds': self.load_seconds, 'calls': self.calls,
+                'run_seconds': self.run_seconds, 'errors': self.errors,
+                'metrics': self.interpreter.metrics.to_dict() if self.interpreter else Metrics().to_dict()}
+
+
+class Batch:
+    def __init__(self, tier_threshold=1000, fleet_workers=None):
+        self.tier_threshold = tier_threshold
+        self.fleet_workers = fleet_workers
+        self.scripts = {}  # absolute path -> Script, in first-use order
+
+    def load(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        script = self.scripts.get(path)
+        if script is None:
+            script = self.scripts[path] = Script(path)
+        if script.key == key:
+            return script
+        # New or changed on disk: parse it again. Adventure bodies stay lazy, so a
+        # job only pays for the adventures it calls
+        start = time.perf_counter()
+        try:
+            with open(path, encoding='utf-8') as f:
+                code = f.read()
+            metrics = Metrics()
+            interpreter = Interpreter(Parser(Lexer(code, metrics).get_tokens(), lazy=True, metrics=metrics),
+                                      tier_threshold=self.tier_threshold, fleet_workers=self.fleet_workers)
+            interpreter.interpret()
+        finally:
+            script.loads += 1
+            script.load_seconds += time.perf_counter() - start
+        self.shutdown(script.interpreter)
+        script.key = key
+        script.interpreter = interpreter
+        return script
+
+    def call(self, path, target, args):
+        script = self.load(path)
+        ship, _, adventure = target.partition('.')
+        if not adventure:
+            raise RuntimeError(f"Expected Ship.adventure, got {target}")
+        if ship not in script.interpreter.symbol_table:
+            raise RuntimeError(f"Unknown ship: {ship}")
+        start = time.perf_counter()
+        try:
+            return script.interpreter.execute_method(ship, adventure, args)
+        finally:
+            script.calls += 1
+            script.run_seconds += time.perf_counter() - start
+
+    def run(self, path, target=None, args=()):
+        # One job; any error it raises is printed and counted, so a batch carries on
+        # past it (KeyboardInterrupt is not an Exception and still stops the batch)
+        try:
+            if target is None:
+                self.load(path)
+                return True
+            result = self.call(path, target, [parse_argument(arg) for arg in args])
+        except Exception as e:
+            script = self.scripts.get(os.path.abspath(path))
+            if script is not None:
+                script.errors += 1
+            print(f"{path}: {type(e).__name__}: {e}", file=sys.stderr)
+            return False
+        if result is not None:
+            print(result)
+        return True
+
+    def shutdown(self, interpreter):
+        if interpreter is None:
+            return
+        if interpreter.compile_executor is not None:
+            interpreter.compile_executor.shutdown()
+        if interpreter.fleet_executor is not None:
+            interpreter.fleet_executor.shutdown()
+
+    def close(self):
+        for script in self.scripts.values():
+            self.shutdown(script.interpreter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_jobs(lines):
+    for number, line in enumerate(lines, 1):
+        try:
+            words = shlex.split(line, comments=True)
+        except ValueError as e:
+            yield number, e
+            continue
+        if words:
+            yield number, words
+
+
+def print_timings(report):
+    startup = report['startup']
+    out = sys.stderr
+    print(f"startup: imports {startup['imports'] * 1000:.1f} ms, ready after {startup['ready'] * 1000:.1f} ms",
+          file=out)
+    print(f"{'script':40} {'loads':>5} {'load ms':>9} {'calls':>7} {'run ms':>9} {'errors':>6}", file=out)
+    for script in report['scripts']:
+        path = script['path']
+        if len(path) > 40:
+            path = '...' + path[-37:]
+        print(f"{path:40} {script['loads']:5} {script['load_seconds'] * 1000:9.1f} {script['calls']:7} "
+              f"{script['run_seconds'] * 1000:9.1f} {script['errors']:6}", file=out)
+    print(f"total {report['total_seconds'] * 1000:.1f} ms: {report['jobs']} jobs, {report['errors']} failed", file=out)
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--tier-threshold', type=int, default=1000,
+                        help='calls plus loop iterations before an adventure is compiled')
+    common.add_argument('--fleet-workers', type=int)
+    common.add_argument('--timings', action='store_true', help='print per-script timings to stderr')
+    common.add_argument('--json', metavar='PATH', help='write the timing report as JSON')
+    parser = argparse.ArgumentParser(prog='piratespeak', description='Run PirateSpeak adventures')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', parents=[common], help='run one adventure of a script')
+    run_parser.add_argument('script')
+    run_parser.add_argument('target', nargs='?', metavar='Ship.adventure')
+    run_parser.add_argument('args', nargs='*')
+    batch_parser = commands.add_parser('batch', parents=[common], help='run a file of jobs in one process')
+    batch_parser.add_argument('jobs', help="job file, or - for stdin")
+    args = parser.parse_args(argv)
+    lines = None
+    if args.command == 'batch':
+        try:
+            lines = sys.stdin if args.jobs == '-' else open(args.jobs, encoding='utf-8')
+        except OSError as e:
+            parser.error(f"cannot read {args.jobs}: {e.strerror}")
+
+    failed = 0
+    jobs = 0
+    with Batch(args.tier_threshold, args.fleet_workers) as batch:
+        ready = time.perf_counter()
+        if args.command == 'run':
+            jobs = 1
+            failed = not batch.run(args.script, args.target, args.args)
+        else:
+            try:
+                for number, job in read_jobs(lines):
+                    jobs += 1
+                    if isinstance(job, ValueError):
+                        print(f"{args.jobs}:{number}: {job}", file=sys.stderr)
+                        failed += 1
+                    elif not batch.run(job[0], job[1] if len(job) > 1 else None, job[2:]):
+                        failed += 1
+            finally:
+                if lines is not sys.stdin:
+                    lines.close()
+        sys.stdout.flush()
+        report = {'startup': {'imports': IMPORT_SECONDS, 'ready': ready - START},
+                  'scripts': [script.report() for script in batch.scripts.values()],
+                  'total_seconds': time.perf_counter() - START, 'jobs': jobs, 'errors': int(failed)}
+
+    if args.timings:
+        print_timings(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,129 +1,1282 @@
-class Interpreter:
-    def __init__(self, parser):
-        self.parser = parser
-        self.symbol_table = {}
-
-    def interpret(self):
-        program = self.parser.parse()
-        for class_node in program:
-            self.interpret_class(class_node)
-
-    def interpret_class(self, class_node):
-        class_name = class_node['name']
-        self.symbol_table[class_name] = {}
-
-        for member in class_node['members']:
-            if member['type'] == 'variable':
-                self.interpret_variable_declaration(class_name, member)
-            elif member['type'] == 'method':
-                self.interpret_method_declaration(class_name, member)
-
-    def interpret_variable_declaration(self, class_name, variable_node):
-        var_type = variable_node['var_type']
-        var_name = variable_node['name']
-        self.symbol_table[class_name][var_name] = None
-
-    def interpret_method_declaration(self, class_name, method_node):
-        method_name = method_node['name']
-        self.symbol_table[class_name][method_name] = method_node  # Store method definition for later execution
-
-    def execute_method(self, class_name, method_name, args):
-        method_node = self.symbol_table[class_name][method_name]
-        parameters = method_node['params']
-        method_body = method_node['body']
-
-        # Bind arguments to parameter names in the symbol table
-        for i in range(len(parameters)):
-            param_name = parameters[i]['name']
-            param_value = args[i]  # Assuming arguments are passed correctly
-            self.symbol_table[class_name][param_name] = param_value
-
-        # Execute method body statements
-        for statement in method_body:
-            self.execute_statement(statement)
-
-    def execute_statement(self, statement):
-        if statement['type'] == 'expression':
-            self.execute_expression(statement['expression'])
-        elif statement['type'] == 'return':
-            return self.execute_expression(statement['expression'])
-        elif statement['type'] == 'if':
-            if self.execute_expression(statement['condition']):
-                self.execute_statement(statement['if_body'])
-            elif statement['else_body'] is not None:
-                self.execute_statement(statement['else_body'])
-        elif statement['type'] == 'for':
-            if statement['init']:
-                self.execute_expression(statement['init'])
-            while self.execute_expression(statement['condition']):
-                self.execute_statement(statement['body'])
-                if statement['update']:
-                    self.execute_expression(statement['update'])
-        elif statement['type'] == 'while':
-            while self.execute_expression(statement['condition']):
-                self.execute_statement(statement['body'])
-        elif statement['type'] == 'block':
-            for stmt in statement['statements']:
-                self.execute_statement(stmt)
-        elif statement['type'] == 'variable':
-            self.execute_variable_declaration(statement)
-        elif statement['type'] == 'assignment':
-            self.execute_assignment(statement)
-        else:
-            raise RuntimeError(f"Unknown statement type: {statement['type']}")
-
-    def execute_expression(self, expression):
-        if expression['type'] == 'literal':
-            return expression['value']
-        elif expression['type'] == 'identifier':
-            # Lookup identifier value in the symbol table
-            # For simplicity, assuming direct values in symbol table for literals
-            return self.symbol_table[expression['value']]
-        elif expression['type'] == 'binary':
-            left = self.execute_expression(expression['left'])
-            right = self.execute_expression(expression['right'])
-            if expression['operator'] == '+':
-                return left + right
-            elif expression['operator'] == '-':
-                return left - right
-            elif expression['operator'] == '*':
-                return left * right
-            elif expression['operator'] == '/':
-                return left / right
-            elif expression['operator'] == '&&':
-                return left and right
-            elif expression['operator'] == '||':
-                return left or right
-            elif expression['operator'] == '==':
-                return left == right
-            elif expression['operator'] == '!=':
-                return left != right
-            elif expression['operator'] == '<':
-                return left < right
-            elif expression['operator'] == '>':
-                return left > right
-            elif expression['operator'] == '<=':
-                return left <= right
-            elif expression['operator'] == '>=':
-                return left >= right
-            else:
-                raise RuntimeError(f"Unknown operator: {expression['operator']}")
-        elif expression['type'] == 'unary':
-            if expression['operator'] == '-':
-                return -self.execute_expression(expression['expression'])
-            elif expression['operator'] == '!':
-                return not self.execute_expression(expression['expression'])
-            else:
-                raise RuntimeError(f"Unknown unary operator: {expression['operator']}")
-        else:
-            raise RuntimeError(f"Unknown expression type: {expression['type']}")
-
-    def execute_variable_declaration(self, variable_node):
-        # Since PirateSpeak doesn't handle runtime variable declarations explicitly,
-        # this method might not be used directly in the interpreter.
-        pass
-
-    def execute_assignment(self, assignment_node):
-        left = assignment_node['left']
-        right = self.execute_expression(assignment_node['right'])
-        self.symbol_table[left['value']] = right
+import operator
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from metrics import Metrics
+from parser import Parser
+
+class ReturnSignal(Exception):
+    # Unwinds the statements of an adventure back to execute_method
+    def __init__(self, value):
+        self.value = value
+
+
+class TailCall:
+    # `return f(...)` calling an adventure of the same ship, handed back to
+    # Interpreter.invoke to run in place of the returning one
+    __slots__ = ('method_node', 'args')
+
+    def __init__(self, method_node, args):
+        self.method_node = method_node
+        self.args = args
+
+
+class Rope:
+    # A scroll built by repeated '+'. Appends share one growing list of pieces, so
+    # `msg = msg + "..."` in a loop is amortized O(1) instead of copying the whole
+    # string; the pieces are joined only when the value is observed.
+    MIN_LENGTH = 256  # shorter results stay plain str
+    __slots__ = ('pieces', 'count', 'length', 'flat')
+
+    def __init__(self, pieces, count, length):
+        self.pieces = pieces  # may be shared with longer ropes; only the first count are ours
+        self.count = count
+        self.length = length
+        self.flat = None
+
+    def __add__(self, other):
+        if type(other) is Rope:
+            other = str(other)
+        elif type(other) is not str:
+            return NotImplemented
+        pieces = self.pieces
+        if len(pieces) == self.count:
+            pieces.append(other)
+            if pieces[self.count] is other:
+                return Rope(pieces, self.count + 1, self.length + len(other))
+            # Another thread appended to the same rope first; ours landed after theirs
+        pieces = pieces[:self.count]  # a sibling already appended to the shared list
+        pieces.append(other)
+        return Rope(pieces, self.count + 1, self.length + len(other))
+
+    def __radd__(self, other):
+        if type(other) is not str:
+            return NotImplemented
+        return Rope([other, str(self)], 2, len(other) + self.length)
+
+    def __str__(self):
+        if self.flat is None:
+            pieces = self.pieces if len(self.pieces) == self.count else self.pieces[:self.count]
+            self.flat = ''.join(pieces)
+        return self.flat
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __len__(self):
+        return self.length
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __eq__(self, other):
+        return str(self) == (str(other) if type(other) is Rope else other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __lt__(self, other):
+        return str(self) < (str(other) if type(other) is Rope else other)
+
+    def __le__(self, other):
+        return str(self) <= (str(other) if type(other) is Rope else other)
+
+    def __gt__(self, other):
+        return str(self) > (str(other) if type(other) is Rope else other)
+
+    def __ge__(self, other):
+        return str(self) >= (str(other) if type(other) is Rope else other)
+
+
+def add_values(left, right):
+    # '+' for every value: long scroll concatenations become a Rope
+    if type(left) is str:
+        if type(right) is str:
+            length = len(left) + len(right)
+            if length < Rope.MIN_LENGTH:
+                return left + right
+            return Rope([left, right], 2, length)
+        if type(right) is Rope:
+            return Rope([left, str(right)], 2, len(left) + len(right))
+    return left + right
+
+
+class ShipLayout:
+    # Fixed field layout of a ship: treasure number i lives at offset i of every instance
+    __slots__ = ('name', 'fields', 'slots', 'defaults', 'methods')
+
+    def __init__(self, name):
+        self.name = name
+        self.fields = []
+        self.slots = {}
+        self.defaults = []
+        self.methods = {}
+
+    def add_field(self, name):
+        if name not in self.slots:
+            self.slots[name] = len(self.fields)
+            self.fields.append(name)
+            self.defaults.append(None)
+
+    def instantiate(self):
+        instance = ShipInstance(self.defaults)
+        instance.layout = self
+        return instance
+
+
+class ShipInstance(list):
+    # The field values themselves, indexed by offset; no per-instance dict
+    __slots__ = ('layout',)
+
+    # Ships compare by identity, not by their field values
+    __eq__ = object.__eq__
+    __ne__ = object.__ne__
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={value!r}" for name, value in zip(self.layout.fields, self))
+        return f"{self.layout.name}({fields})"
+
+
+class InlineCache:
+    # Remembers, per call or field-access site, what a name resolved to for each
+    # receiver layout seen there: monomorphic for one layout, polymorphic up to
+    # POLYMORPHIC_LIMIT, megamorphic (no longer filled) beyond that
+    POLYMORPHIC_LIMIT = 4
+    # entries is only ever replaced, never changed in place, so a lookup racing an
+    # update on another thread sees the old tuple or the new one
+    __slots__ = ('kind', 'site', 'entries', 'megamorphic', 'hits', 'misses')
+
+    def __init__(self, kind, site):
+        self.kind = kind
+        self.site = site
+        self.reset()
+
+    def reset(self):
+        self.entries = ()  # (layout, target) pairs, most used first
+        self.megamorphic = False
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, layout):
+        entries = self.entries
+        if entries and entries[0][0] is layout:
+            self.hits += 1
+            return entries[0][1]
+        for entry in entries[1:]:
+            if entry[0] is layout:
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        return None
+
+    def update(self, layout, target):
+        entries = self.entries
+        if len(entries) < self.POLYMORPHIC_LIMIT:
+            self.entries = entries + ((layout, target),)
+        else:
+            self.megamorphic = True
+
+    def invalidate(self, layout):
+        # Drops entries keyed on the layout as well as entries resolving to it
+        entries = self.entries
+        keep = tuple(entry for entry in entries if entry[0] is not layout and entry[1] is not layout)
+        if len(keep) != len(entries):
+            self.entries = keep
+            self.megamorphic = False
+
+    def state(self):
+        if self.megamorphic:
+            return 'megamorphic'
+        if len(self.entries) > 1:
+            return 'polymorphic'
+        return 'monomorphic' if self.entries else 'uninitialized'
+
+    def stats(self):
+        return {'site': self.site, 'kind': self.kind, 'state': self.state(), 'hits': self.hits,
+                'misses': self.misses, 'layouts': [layout.name for layout, _ in self.entries]}
+
+
+class Memo:
+    # Results of a pure adventure keyed by its arguments; once limit entries are
+    # held the least recently used one is evicted
+    MISSING = object()
+    KEY_TYPES = frozenset((int, float, str, bool, type(None)))
+    __slots__ = ('limit', 'enabled', 'table', 'hits', 'misses', 'evictions')
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.enabled = True
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, args):
+        # None when disabled or when an argument is a ship, whose fields can change
+        if not self.enabled:
+            return None
+        key = []
+        for arg in args:
+            kind = type(arg)
+            if kind is Rope:
+                arg, kind = str(arg), str
+            elif kind not in self.KEY_TYPES:
+                return None
+            key.append(kind)  # 1, 1.0 and aye are equal but not interchangeable
+            key.append(arg)
+        return tuple(key)
+
+    def lookup(self, key):
+        value = self.table.get(key, self.MISSING)
+        if value is self.MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            try:
+                self.table.move_to_end(key)
+            except KeyError:
+                pass  # evicted by another thread in between; the value is still right
+        return value
+
+    def store(self, key, value):
+        self.table[key] = value
+        self.shrink()
+
+    def shrink(self):
+        while len(self.table) > self.limit:
+            try:
+                self.table.popitem(last=False)
+            except KeyError:
+                break  # emptied by other threads
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'enabled': self.enabled, 'size': len(self.table), 'limit': self.limit, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+class Profile:
+    # Invocation and loop back-edge counters of one adventure, its compiled tier
+    # once it has been promoted, and its memo table if it is memoized
+    __slots__ = ('calls', 'backedges', 'loops', 'state', 'compiled', 'memo')
+
+    def __init__(self, loop_count):
+        self.calls = 0
+        self.backedges = 0
+        self.loops = [0] * loop_count  # back-edges per loop, in source order
+        self.state = 'interpreted'  # -> 'compiling' -> 'compiled' (or 'failed')
+        self.compiled = None
+        self.memo = None
+
+
+class Frame:
+    __slots__ = ('instance', 'locals', 'method')
+
+    def __init__(self, instance, locals, method):
+        self.instance = instance
+        self.locals = locals
+        self.method = method
+
+
+class Compiler:
+    # Turns a prepared adventure into a Python function (interp, instance, args).
+    # Parameters and locals become Python locals, treasure is indexed by its fixed
+    # offset, and call and member sites go through the same inline caches as the
+    # tree walker.
+    OPERATORS = ('+', '-', '*', '/', '==', '!=', '<', '>', '<=', '>=')
+
+    def __init__(self, layout, method_node):
+        self.layout = layout
+        self.method_node = method_node
+        self.constants = []
+        self.lines = []
+        self.loops = 0
+        self.coins = set()  # params and locals declared coin
+
+    def compile(self):
+        params = [param['name'] for param in self.method_node['params']]
+        self.coins = {param['name'] for param in self.method_node['params'] if param['type'] == 'coin'}
+        self.collect_coins(self.method_node['body'])
+        self.emit(0, 'def adventure(interp, instance, args):')
+        if params:
+            self.emit(1, ', '.join('l_' + name for name in params) + ', = args')
+        self.emit(1, 'try:')
+        self.compile_statement(self.method_node['body'], 2)
+        self.emit(2, 'return None')
+        self.emit(1, 'except NameError as e:')
+        self.emit(2, "raise RuntimeError('Undefined name: ' + str(e).split(\"'\")[1][2:]) from None")
+        name = f"<adventure {self.layout.name}.{self.method_node['name']}>"
+        namespace = {'K': self.constants, 'store': store_item, 'add_values': add_values, 'Frame': Frame}
+        exec(compile('\n'.join(self.lines), name, 'exec'), namespace)
+        return namespace['adventure']
+
+    def emit(self, indent, line):
+        self.lines.append('    ' * indent + line)
+
+    def collect_coins(self, node):
+        if isinstance(node, list):
+            for item in node:
+                self.collect_coins(item)
+        elif isinstance(node, dict):
+            if node.get('type') == 'variable' and node['var_type'] == 'coin':
+                self.coins.add(node['name'])
+            for value in node.values():
+                self.collect_coins(value)
+
+    def is_number(self, expression):
+        # Only a hint: a plain '+' is correct for any values, add_values is only
+        # needed to start ropes when both sides may be scrolls
+        kind = expression['type']
+        if kind == 'literal':
+            return type(expression['value']) in (int, float)
+        elif kind == 'identifier':
+            return expression['value'] in self.coins
+        elif kind == 'unary':
+            return expression['operator'] == '-'
+        elif kind in ('binary', 'term', 'factor'):
+            if expression['operator'] in ('-', '/'):
+                return True
+            return self.is_number(expression['left']) or self.is_number(expression['right'])
+        return False
+
+    def constant(self, value):
+        self.constants.append(value)
+        return f"K[{len(self.constants) - 1}]"
+
+    def compile_block(self, statement, indent):
+        start = len(self.lines)
+        self.compile_statement(statement, indent)
+        if len(self.lines) == start:
+            self.emit(indent, 'pass')
+
+    def compile_statement(self, statement, indent):
+        kind = statement['type']
+        if kind == 'expression' or kind == 'assignment':
+            expression = statement['expression'] if kind == 'expression' else statement
+            if expression['type'] == 'assignment':
+                self.compile_store(expression, indent)
+            else:
+                self.emit(indent, self.compile_expression(expression))
+        elif kind == 'return':
+            expression = statement['expression']
+            if statement.get('tail'):
+                # Returned to invoke as a TailCall when it resolves to an adventure
+                args = ''.join(self.compile_expression(arg) + ', ' for arg in expression['arguments'])
+                self.emit(indent, f"return interp.call_local({self.constant(expression)}, instance, ({args}), True)")
+                return
+            value = 'None' if expression is None else self.compile_expression(expression)
+            self.emit(indent, f"return {value}")
+        elif kind == 'if':
+            self.emit(indent, f"if {self.compile_expression(statement['condition'])}:")
+            self.compile_block(statement['if_body'], indent + 1)
+            if statement['else_body'] is not None:
+                self.emit(indent, 'else:')
+                self.compile_block(statement['else_body'], indent + 1)
+        elif kind == 'for':
+            if statement['init']:
+                self.compile_statement({'type': 'expression', 'expression': statement['init']}, indent)
+            condition = 'True' if statement['condition'] is None else self.compile_expression(statement['condition'])
+            counter = self.open_loop(condition, indent)
+            self.compile_block(statement['body'], indent + 2)
+            if statement['update']:
+                self.compile_statement({'type': 'expression', 'expression': statement['update']}, indent + 2)
+            self.close_loop(counter, indent)
+        elif kind == 'while':
+            counter = self.open_loop(self.compile_expression(statement['condition']), indent)
+            self.compile_block(statement['body'], indent + 2)
+            self.close_loop(counter, indent)
+        elif kind == 'block':
+            for stmt in statement['statements']:
+                self.compile_statement(stmt, indent)
+        elif kind == 'variable':
+            self.emit(indent, f"l_{statement['name']} = None")
+        elif kind == 'fleet':
+            # The interpreter owns the worker pool: the locals go in as a frame, the
+            # loop and haul variables come back out of it
+            self.emit(indent, "fleet_locals = {name[2:]: value for name, value in locals().items() if name[:2] == 'l_'}")
+            frame = f"Frame(instance, fleet_locals, {self.constant(self.method_node)})"
+            self.emit(indent, f"interp.execute_fleet({self.constant(statement)}, {frame})")
+            for name in [statement['var'], *statement['reductions']]:
+                self.emit(indent, f"l_{name} = fleet_locals[{name!r}]")
+        else:
+            raise RuntimeError(f"Unknown statement type: {kind}")
+
+    def open_loop(self, condition, indent):
+        # Iterations are counted in a Python local and added to the metrics once,
+        # however the loop is left
+        counter = f"n_{self.loops}"
+        self.loops += 1
+        self.emit(indent, f"{counter} = 0")
+        self.emit(indent, 'try:')
+        self.emit(indent + 1, f"while {condition}:")
+        self.emit(indent + 2, f"{counter} += 1")
+        return counter
+
+    def close_loop(self, counter, indent):
+        self.emit(indent, 'finally:')
+        self.emit(indent + 1, f"interp.metrics.loop_iterations += {counter}")
+
+    def compile_store(self, assignment_node, indent):
+        left = assignment_node['left']
+        value = self.compile_expression(assignment_node['right'])
+        if left['type'] == 'identifier':
+            self.emit(indent, f"l_{left['value']} = {value}")
+        elif left['type'] == 'field':
+            self.emit(indent, f"instance[{left['slot']}] = {value}")
+        else:
+            self.emit(indent, self.compile_expression(assignment_node))
+
+    def compile_expression(self, expression):
+        kind = expression['type']
+        if kind == 'literal':
+            return repr(expression['value'])
+        elif kind == 'identifier':
+            return f"l_{expression['value']}"
+        elif kind == 'field':
+            return f"instance[{expression['slot']}]"
+        elif kind == 'member':
+            return f"interp.member_get({self.constant(expression)}, {self.compile_expression(expression['object'])})"
+        elif kind == 'assignment':
+            left = expression['left']
+            value = self.compile_expression(expression['right'])
+            if left['type'] == 'identifier':
+                return f"(l_{left['value']} := {value})"
+            elif left['type'] == 'field':
+                return f"store(instance, {left['slot']}, {value})"
+            elif left['type'] == 'member':
+                target = self.compile_expression(left['object'])
+                return f"interp.member_set({self.constant(left)}, {target}, {value})"
+            raise RuntimeError("Invalid assignment target")
+        elif kind == 'logical_or':
+            return f"({self.compile_expression(expression['left'])} or {self.compile_expression(expression['right'])})"
+        elif kind == 'logical_and':
+            return f"({self.compile_expression(expression['left'])} and {self.compile_expression(expression['right'])})"
+        elif kind in ('binary', 'term', 'factor', 'comparison', 'equality'):
+            if expression['operator'] not in self.OPERATORS:
+                raise RuntimeError(f"Unknown operator: {expression['operator']}")
+            left = self.compile_expression(expression['left'])
+            right = self.compile_expression(expression['right'])
+            if expression['operator'] == '+' and not (self.is_number(expression['left']) or self.is_number(expression['right'])):
+                return f"add_values({left}, {right})"
+            return f"({left} {expression['operator']} {right})"
+        elif kind == 'unary':
+            operand = self.compile_expression(expression['expression'])
+            if expression['operator'] == '-':
+                return f"(-{operand})"
+            elif expression['operator'] == '!':
+                return f"(not {operand})"
+            raise RuntimeError(f"Unknown unary operator: {expression['operator']}")
+        elif kind == 'call':
+            callee = expression['callee']
+            args = ''.join(self.compile_expression(arg) + ', ' for arg in expression['arguments'])
+            if callee['type'] == 'member':
+                target = self.compile_expression(callee['object'])
+                return f"interp.call_member({self.constant(expression)}, {target}, ({args}))"
+            elif callee['type'] == 'identifier':
+                return f"interp.call_local({self.constant(expression)}, instance, ({args}))"
+            raise RuntimeError("Only adventures, ships and builtins can be called")
+        raise RuntimeError(f"Unknown expression type: {kind}")
+
+
+def store_item(sequence, index, value):
+    # Field assignment used as an expression inside compiled adventures
+    sequence[index] = value
+    return value
+
+
+class Interpreter:
+    BINARY_OPERATORS = {
+        '+': add_values,
+        '-': operator.sub,
+        '*': operator.mul,
+        '/': operator.truediv,
+        '==': operator.eq,
+        '!=': operator.ne,
+        '<': operator.lt,
+        '>': operator.gt,
+        '<=': operator.le,
+        '>=': operator.ge,
+    }
+    BUILTINS = {'print': print, 'max': max, 'min': min}
+    # A fleet loop is split into this many chunks per worker, so uneven iterations even out
+    FLEET_CHUNKS_PER_WORKER = 4
+    # Runtime state attached to AST nodes, left out when the program is sent to fleet workers
+    RUNTIME_KEYS = ('profile', 'caches', 'cache', 'fleets', 'blocked', 'in_place')
+
+    def __init__(self, parser, tier_threshold=1000, background_compile=True, metrics=None, fleet_workers=None,
+                 memoize='pure', memo_limit=1024):
+        self.parser = parser
+        if metrics is None:
+            metrics = getattr(parser, 'metrics', None) or Metrics()
+        self.metrics = metrics
+        self.frame_depth = 0
+        self.symbol_table = {}  # ship name -> ShipLayout
+        self.ships = {}  # ship name -> the instance execute_method uses when none is given
+        # Adventures whose calls plus loop back-edges reach tier_threshold are compiled
+        # (see Compiler); None keeps everything in the tree walker
+        self.tier_threshold = tier_threshold
+        self.tier_limit = float('inf') if tier_threshold is None else tier_threshold
+        self.background_compile = background_compile
+        self.compile_executor = None
+        self.tier_events = []
+        self.tier_lock = threading.Lock()
+        self.executor_lock = threading.Lock()  # creating the compile and fleet pools
+        self.frozen = False
+        self.fleet_workers = fleet_workers or os.cpu_count() or 1
+        self.fleet_executor = None
+        self.program_version = 0  # bumped whenever a ship is (re)loaded
+        self.fleet_program = None  # (program_version, pickled ships) as sent to the workers
+        self.fleet_pool_version = None  # program_version the fleet pool's workers were started with
+        # 'pure' memoizes charted adventures and those proven pure, 'charted' only the
+        # former, None neither; set_memo overrides it per adventure
+        self.memoize = memoize
+        self.memo_limit = memo_limit
+
+    def interpret(self):
+        program = self.parser.parse()
+        for class_node in program:
+            self.interpret_class(class_node)
+
+    def interpret_class(self, class_node):
+        if self.frozen:
+            raise RuntimeError("The program is frozen; load ships into a new Interpreter")
+        class_name = class_node['name']
+        self.program_version += 1
+        if class_name in self.symbol_table:
+            # Reloading a ship: no site may keep resolving names against the old layout
+            old_layout = self.symbol_table[class_name]
+            for cache in self.inline_caches():
+                cache.invalidate(old_layout)
+        self.symbol_table[class_name] = ShipLayout(class_name)
+
+        for member in class_node['members']:
+            if member['type'] == 'variable':
+                self.interpret_variable_declaration(class_name, member)
+            elif member['type'] == 'method':
+                self.interpret_method_declaration(class_name, member)
+        for method_node in self.symbol_table[class_name].methods.values():
+            for cache in method_node.get('caches', ()):
+                cache.reset()  # the nodes may have been run by another interpreter
+        self.ships[class_name] = self.symbol_table[class_name].instantiate()
+
+    def interpret_variable_declaration(self, class_name, variable_node):
+        self.symbol_table[class_name].add_field(variable_node['name'])
+
+    def interpret_method_declaration(self, class_name, method_node):
+        method_name = method_node['name']
+        self.symbol_table[class_name].methods[method_name] = method_node  # Store method definition for later execution
+
+    def inline_caches(self):
+        for layout in self.symbol_table.values():
+            for method_node in layout.methods.values():
+                yield from method_node.get('caches', ())
+
+    def inline_cache_stats(self):
+        sites = [cache.stats() for cache in self.inline_caches()]
+        hits = sum(site['hits'] for site in sites)
+        misses = sum(site['misses'] for site in sites)
+        return {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+                'sites': sites}
+
+    def new_instance(self, class_name):
+        if class_name not in self.symbol_table:
+            raise RuntimeError(f"Unknown ship: {class_name}")
+        return self.symbol_table[class_name].instantiate()
+
+    def freeze(self):
+        # Prepares every adventure up front (lazy bodies, field offsets, caches, purity,
+        # fleet checks), so running the program no longer changes its structure and
+        # Executions can share it across threads
+        for layout in self.symbol_table.values():
+            for method_node in layout.methods.values():
+                if method_node.get('profile') is None:
+                    self.prepare_method(layout, method_node)
+                for statement in method_node['fleets']:
+                    if 'blocked' not in statement:
+                        self.check_fleet(statement, layout)
+        self.frozen = True
+        return self
+
+    def execution(self):
+        # Per-thread state for running this program: see Execution
+        if not self.frozen:
+            self.freeze()
+        return Execution(self)
+
+    def execute_method(self, class_name, method_name, args, instance=None):
+        layout = self.symbol_table[class_name]
+        if method_name not in layout.methods:
+            raise RuntimeError(f"Unknown adventure: {class_name}.{method_name}")
+        if instance is None:
+            instance = self.ships[class_name]
+        self.metrics.runs += 1
+        start = time.perf_counter()
+        try:
+            result = self.invoke(layout.methods[method_name], instance, args)
+            return str(result) if type(result) is Rope else result
+        finally:
+            self.metrics.execute_seconds += time.perf_counter() - start
+
+    def invoke(self, method_node, instance, args):
+        # Tail calls come back from either tier as a TailCall and run in this loop, on
+        # the same Python stack and Frame, so tail recursion (also between adventures
+        # of one ship) takes constant stack space
+        metrics = self.metrics
+        pending = None  # (memo, key) of every hop, all answered by the final value
+        frame = None
+        self.frame_depth += 1
+        if self.frame_depth > metrics.peak_frame_depth:
+            metrics.peak_frame_depth = self.frame_depth
+        try:
+            while True:
+                profile = method_node.get('profile')
+                if profile is None:
+                    self.prepare_method(instance.layout, method_node)
+                    profile = method_node['profile']
+                parameters = method_node['params']
+                if len(args) != len(parameters):
+                    raise RuntimeError(f"{instance.layout.name}.{method_node['name']} expects {len(parameters)} arguments, got {len(args)}")
+                memo = profile.memo
+                if memo is not None:
+                    key = memo.key(args)
+                    if key is not None:
+                        value = memo.lookup(key)
+                        if value is not Memo.MISSING:
+                            break
+                        if pending is None:
+                            pending = []
+                        pending.append((memo, key))
+                metrics.calls += 1
+                if profile.compiled is not None:
+                    value = profile.compiled(self, instance, args)
+                else:
+                    profile.calls += 1
+                    if profile.calls + profile.backedges >= self.tier_limit and profile.state == 'interpreted':
+                        self.tier_up(method_node, instance.layout, 'calls')
+
+                    # Bind arguments to parameter names
+                    local_values = {param['name']: arg for param, arg in zip(parameters, args)}
+                    if frame is None:
+                        frame = Frame(instance, local_values, method_node)
+                    else:
+                        frame.locals = local_values
+                        frame.method = method_node
+                    value = None
+                    try:
+                        self.execute_statement(method_node['body'], frame)
+                    except ReturnSignal as signal:
+                        value = signal.value
+                if type(value) is not TailCall:
+                    break
+                method_node, args = value.method_node, value.args
+            if pending is not None:
+                for memo, key in reversed(pending):  # the call that was asked for ends most recent
+                    memo.store(key, value)
+            return value
+        finally:
+            self.frame_depth -= 1
+
+    def prepare_method(self, layout, method_node):
+        if method_node['body'] is None:
+            # Parsed lazily: the body is only built the first time it runs
+            method_node['body'] = self.parser.parse_method_body(method_node)
+        local_names = {param['name'] for param in method_node['params']}
+        self.collect_locals(method_node['body'], local_names)
+        method_node['caches'] = []
+        method_node['loop_count'] = 0
+        method_node['fleets'] = []
+        self.resolve_fields(method_node['body'], layout, local_names, method_node)
+        method_node['profile'] = Profile(method_node['loop_count'])
+        self.plan_memo(layout, method_node)
+
+    def plan_memo(self, layout, method_node):
+        charted = method_node.get('charted')
+        if self.memoize is None or not (charted or self.memoize == 'pure'):
+            return
+        reason = self.impurity(layout, method_node)
+        if reason is None:
+            method_node['profile'].memo = Memo(self.memo_limit)
+        elif charted:
+            # Only what is known to be impure is an error; a callee that has not run
+            # yet just leaves this adventure unmemoized
+            reason = self.impurity(layout, method_node, unprepared_pure=True)
+            if reason:
+                method_node['profile'] = None  # so every call reports it, not only the first
+                raise RuntimeError(f"{layout.name}.{method_node['name']} is charted but {reason}")
+
+    def impurity(self, layout, method_node, seen=None, unprepared_pure=False):
+        # Why the adventure's result is not a function of its arguments alone, or None.
+        # It may not read or write treasure, print, launch ships or call anything but
+        # pure adventures; adventures already being checked count as pure. Callees are
+        # never prepared here: that would parse (and fail on) adventures that may never
+        # be called, so one that has not run yet counts as impure unless unprepared_pure.
+        if seen is None:
+            seen = {id(method_node)}
+        return self.impure_node(method_node['body'], layout, seen, unprepared_pure)
+
+    def impure_node(self, node, layout, seen, unprepared_pure=False):
+        if isinstance(node, list):
+            for item in node:
+                reason = self.impure_node(item, layout, seen, unprepared_pure)
+                if reason:
+                    return reason
+        elif isinstance(node, dict):
+            kind = node.get('type')
+            if kind == 'field':
+                return 'uses ship treasure'
+            if kind == 'member':
+                return f"uses .{node['name']} of another ship"
+            if kind == 'call':
+                callee = node['callee']
+                if callee['type'] != 'identifier':
+                    return f"calls .{callee['name']}() on another ship"
+                name = callee['value']
+                target = layout.methods.get(name) or self.symbol_table.get(name) or self.BUILTINS.get(name)
+                if target is None:
+                    return f"calls unknown {name}"
+                if isinstance(target, ShipLayout):
+                    return f"launches {name}"
+                if target is print:
+                    return 'prints'
+                if isinstance(target, dict) and id(target) not in seen:
+                    seen.add(id(target))
+                    if target.get('profile') is not None:
+                        reason = self.impure_node(target['body'], layout, seen, unprepared_pure)
+                        if reason:
+                            return f"calls {name}, which {reason}"
+                    elif not unprepared_pure:
+                        return f"calls {name}, which has not run yet"
+            for key, value in node.items():
+                if key != 'cache':
+                    reason = self.impure_node(value, layout, seen, unprepared_pure)
+                    if reason:
+                        return reason
+        return None
+
+    def set_memo(self, class_name, method_name, enabled=True, limit=None):
+        # Per-adventure switch; turning it on for an adventure that is not pure is an error
+        layout = self.symbol_table[class_name]
+        if method_name not in layout.methods:
+            raise RuntimeError(f"Unknown adventure: {class_name}.{method_name}")
+        method_node = layout.methods[method_name]
+        if method_node.get('profile') is None:
+            self.prepare_method(layout, method_node)
+        profile = method_node['profile']
+        if profile.memo is None:
+            if not enabled:
+                return
+            reason = self.impurity(layout, method_node)
+            if reason:
+                raise RuntimeError(f"Cannot memoize {class_name}.{method_name}: it {reason}")
+            profile.memo = Memo(self.memo_limit)
+        profile.memo.enabled = enabled
+        if limit is not None:
+            profile.memo.limit = limit
+            profile.memo.shrink()
+
+    def memo_stats(self):
+        adventures = []
+        for layout in self.symbol_table.values():
+            for method_node in layout.methods.values():
+                profile = method_node.get('profile')
+                if profile is not None and profile.memo is not None:
+                    adventures.append({'ship': layout.name, 'adventure': method_node['name'], **profile.memo.stats()})
+        return adventures
+
+    def tier_up(self, method_node, layout, reason):
+        with self.tier_lock:
+            profile = method_node['profile']
+            if profile.state != 'interpreted':
+                return
+            profile.state = 'compiling'
+        if not self.background_compile:
+            self.compile_method(method_node, layout, reason)
+            return
+        with self.executor_lock:
+            if self.compile_executor is None:
+                self.compile_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='piratespeak-tier')
+        self.compile_executor.submit(self.compile_method, method_node, layout, reason)
+
+    def compile_method(self, method_node, layout, reason):
+        profile = method_node['profile']
+        event = {'ship': layout.name, 'adventure': method_node['name'], 'reason': reason,
+                 'calls': profile.calls, 'backedges': profile.backedges}
+        start = time.perf_counter()
+        try:
+            compiled = Compiler(layout, method_node).compile()
+        except Exception as e:
+            # Runs on the compile thread: record the failure and stay in the tree walker
+            profile.state = 'failed'
+            event['error'] = f"{type(e).__name__}: {e}"
+        else:
+            profile.compiled = compiled  # picked up atomically by the next invoke
+            profile.state = 'compiled'
+        event['compile_time'] = time.perf_counter() - start
+        self.tier_events.append(event)
+
+    def wait_for_compiles(self):
+        if self.compile_executor is not None:
+            self.compile_executor.submit(lambda: None).result()
+
+    def tier_stats(self):
+        adventures = []
+        for layout in self.symbol_table.values():
+            for method_node in layout.methods.values():
+                profile = method_node.get('profile')
+                if profile is not None:
+                    adventures.append({'ship': layout.name, 'adventure': method_node['name'], 'tier': profile.state,
+                                       'calls': profile.calls, 'backedges': profile.backedges, 'loops': list(profile.loops)})
+        return {'events': list(self.tier_events),
+                'compile_time': sum(event['compile_time'] for event in self.tier_events),
+                'adventures': adventures}
+
+    def collect_locals(self, node, local_names):
+        if isinstance(node, list):
+            for item in node:
+                self.collect_locals(item, local_names)
+        elif isinstance(node, dict):
+            if node.get('type') == 'variable':
+                local_names.add(node['name'])
+            elif node.get('type') == 'fleet':
+                local_names.add(node['var'])
+                local_names.update(node['reductions'])
+            for value in node.values():
+                self.collect_locals(value, local_names)
+
+    def resolve_fields(self, node, layout, local_names, method_node):
+        # Treasure references become fixed offsets into the instance, so reads and
+        # writes never look the field up by name at run time. Sites whose receiver
+        # is only known at run time get an inline cache instead.
+        if isinstance(node, list):
+            for item in node:
+                self.resolve_fields(item, layout, local_names, method_node)
+        elif isinstance(node, dict):
+            node_type = node.get('type')
+            if node_type == 'identifier' and node['value'] in layout.slots and node['value'] not in local_names:
+                node['type'] = 'field'
+                node['slot'] = layout.slots[node['value']]
+            elif node_type == 'return':
+                expression = node['expression']
+                if expression is not None and expression['type'] == 'call' and expression['callee']['type'] == 'identifier':
+                    node['tail'] = True  # may call an adventure of this ship: see TailCall
+            elif node_type in ('for', 'while'):
+                node['loop'] = method_node['loop_count']
+                method_node['loop_count'] += 1
+            elif node_type == 'fleet':
+                node['fleet'] = len(method_node['fleets'])  # how workers find it in their copy
+                method_node['fleets'].append(node)
+            elif node_type == 'member':
+                node['cache'] = InlineCache('field', f"{layout.name}.{method_node['name']}: .{node['name']}")
+                method_node['caches'].append(node['cache'])
+            elif node_type == 'call' and node['callee']['type'] in ('member', 'identifier'):
+                callee = node['callee']
+                name = callee['name'] if callee['type'] == 'member' else callee['value']
+                node['cache'] = InlineCache('call', f"{layout.name}.{method_node['name']}: {name}()")
+                method_node['caches'].append(node['cache'])
+                if callee['type'] == 'member':
+                    self.resolve_fields(callee['object'], layout, local_names, method_node)
+                self.resolve_fields(node['arguments'], layout, local_names, method_node)
+                return
+            for key, value in node.items():
+                if key != 'cache':
+                    self.resolve_fields(value, layout, local_names, method_node)
+
+    def execute_statement(self, statement, frame):
+        self.metrics.nodes_evaluated += 1
+        if statement['type'] == 'expression':
+            self.execute_expression(statement['expression'], frame)
+        elif statement['type'] == 'return':
+            value = None
+            if statement.get('tail'):
+                call_node = statement['expression']
+                self.metrics.nodes_evaluated += 1
+                args = [self.execute_expression(arg, frame) for arg in call_node['arguments']]
+                value = self.call_local(call_node, frame.instance, args, True)
+            elif statement['expression'] is not None:
+                value = self.execute_expression(statement['expression'], frame)
+            raise ReturnSignal(value)
+        elif statement['type'] == 'if':
+            if self.execute_expression(statement['condition'], frame):
+                self.execute_statement(statement['if_body'], frame)
+            elif statement['else_body'] is not None:
+                self.execute_statement(statement['else_body'], frame)
+        elif statement['type'] == 'for':
+            if statement['init']:
+                self.execute_expression(statement['init'], frame)
+            iterations = 0
+            while statement['condition'] is None or self.execute_expression(statement['condition'], frame):
+                self.execute_statement(statement['body'], frame)
+                if statement['update']:
+                    self.execute_expression(statement['update'], frame)
+                iterations += 1
+                if iterations == self.tier_limit:
+                    self.loop_is_hot(frame)
+            self.count_backedges(statement, frame, iterations)
+        elif statement['type'] == 'fleet':
+            self.execute_fleet(statement, frame)
+        elif statement['type'] == 'while':
+            iterations = 0
+            while self.execute_expression(statement['condition'], frame):
+                self.execute_statement(statement['body'], frame)
+                iterations += 1
+                if iterations == self.tier_limit:
+                    self.loop_is_hot(frame)
+            self.count_backedges(statement, frame, iterations)
+        elif statement['type'] == 'block':
+            for stmt in statement['statements']:
+                self.execute_statement(stmt, frame)
+        elif statement['type'] == 'variable':
+            self.execute_variable_declaration(statement, frame)
+        elif statement['type'] == 'assignment':
+            self.execute_assignment(statement, frame)
+        else:
+            raise RuntimeError(f"Unknown statement type: {statement['type']}")
+
+    def execute_fleet(self, statement, frame):
+        # Chunks of the range run in worker processes, each on a copy of the ship and
+        # the locals; only the haul variables come back, combined in chunk order
+        layout = frame.instance.layout
+        if 'blocked' not in statement:
+            self.check_fleet(statement, layout)
+        if statement['blocked']:
+            raise RuntimeError(f"fleet loop in {layout.name}.{frame.method['name']} {statement['blocked']}")
+        start = self.execute_expression(statement['start'], frame)
+        stop = self.execute_expression(statement['stop'], frame)
+        if type(start) is not int or type(stop) is not int:
+            raise RuntimeError(f"fleet loop bounds must be whole numbers, got {start!r} and {stop!r}")
+        if statement['inclusive']:
+            stop += 1
+        step = statement['step']
+        count = len(range(start, stop, step))
+        outer = {}
+        for name in statement['reductions']:
+            if name not in frame.locals:
+                raise RuntimeError(f"Undefined name: {name}")
+            outer[name] = frame.locals[name]
+        values = self.fleet_values(frame)
+        chunks = min(count, self.fleet_workers * self.FLEET_CHUNKS_PER_WORKER)
+        if self.fleet_workers == 1 or chunks < 2 or values is None or statement['in_place']:
+            # Nothing to gain, or state or adventures a worker could not receive: run in place
+            self.run_fleet_range(statement, frame, start, stop)
+        else:
+            fields, local_values = values
+            for name, kind in statement['reductions'].items():
+                if kind == 'sum':
+                    # Every chunk sums from the identity of the outer value's type: 0, 0.0 or ""
+                    seed = local_values[name]
+                    if type(seed) not in (int, float, bool, str):
+                        raise RuntimeError(f"haul sum {name} must start as a number or scroll, got {seed!r}")
+                    local_values[name] = type(seed)()
+            pool = self.fleet_pool()
+            per_chunk = -(-count // chunks)
+            futures = []
+            for first in range(0, count, per_chunk):
+                last = min(first + per_chunk, count)
+                futures.append(pool.submit(
+                    run_fleet_chunk, layout.name, frame.method['name'], statement['fleet'], fields, local_values,
+                    start + first * step, start + last * step))
+            for future in futures:
+                partials, metrics = future.result()
+                self.metrics.merge(metrics)
+                for name, kind in statement['reductions'].items():
+                    if kind == 'sum':
+                        frame.locals[name] = add_values(frame.locals[name], partials[name])
+                    else:
+                        frame.locals[name] = self.BUILTINS[kind](frame.locals[name], partials[name])
+        frame.locals[statement['var']] = start + count * step
+
+    def run_fleet_range(self, statement, frame, start, stop):
+        var = statement['var']
+        body = statement['body']
+        iterations = range(start, stop, statement['step'])
+        for value in iterations:
+            frame.locals[var] = value
+            self.execute_statement(body, frame)
+        self.metrics.loop_iterations += len(iterations)
+        return {name: frame.locals[name] for name in statement['reductions']}
+
+    def fleet_values(self, frame):
+        # Field and local values for the workers, or None if one of them cannot be sent
+        fields = list(frame.instance)
+        local_values = dict(frame.locals)
+        for values in (fields, local_values):
+            for key, value in (values.items() if isinstance(values, dict) else enumerate(values)):
+                if type(value) is Rope:
+                    values[key] = str(value)
+                elif type(value) not in (int, float, str, bool, type(None)):
+                    return None
+        return fields, local_values
+
+    def check_fleet(self, statement, layout):
+        # 'blocked': why the body may not run as a fleet loop at all, or None.
+        # 'in_place': an adventure it reaches could not be prepared (it does not parse, or
+        # is charted but impure), so it is not known to be safe on workers; the loop runs
+        # in place, where calling that adventure fails just as it would in a sail loop
+        seen = set()
+        statement['blocked'] = self.fleet_blocker(statement['body'], layout, seen)
+        statement['in_place'] = None in seen
+
+    def fleet_blocker(self, node, layout, seen):
+        # Workers run on copies of the ship, so nothing a fleet body reaches may write
+        # treasure or print; returns why it does, or None. Adventures that cannot be
+        # prepared are skipped and leave None in seen (see check_fleet)
+        if isinstance(node, list):
+            for item in node:
+                reason = self.fleet_blocker(item, layout, seen)
+                if reason:
+                    return reason
+        elif isinstance(node, dict):
+            kind = node.get('type')
+            if kind == 'assignment' and node['left']['type'] in ('field', 'member'):
+                return 'writes ship treasure'
+            if kind == 'call':
+                callee = node['callee']
+                if callee['type'] != 'identifier':
+                    return f"calls .{callee['name']}() on a ship it cannot see"
+                name = callee['value']
+                target = layout.methods.get(name) or self.symbol_table.get(name) or self.BUILTINS.get(name)
+                if target is print:
+                    return 'prints'
+                if isinstance(target, dict) and id(target) not in seen:
+                    seen.add(id(target))
+                    if target.get('profile') is None:
+                        try:
+                            self.prepare_method(layout, target)
+                        except (SyntaxError, RuntimeError):
+                            seen.add(None)
+                    if target.get('profile') is not None:
+                        reason = self.fleet_blocker(target['body'], layout, seen)
+                        if reason:
+                            return f"calls {name}, which {reason}"
+            for key, value in node.items():
+                if key != 'cache':
+                    reason = self.fleet_blocker(value, layout, seen)
+                    if reason:
+                        return reason
+        return None
+
+    def fleet_pool(self):
+        # Each worker receives the program once, when the pool starts it, rather than
+        # with every chunk; reloading a ship changes the program, so it gets a new pool
+        with self.executor_lock:
+            if self.fleet_executor is None or self.fleet_pool_version != self.program_version:
+                if self.fleet_executor is not None:
+                    self.fleet_executor.shutdown(wait=False)
+                self.fleet_executor = ProcessPoolExecutor(max_workers=self.fleet_workers,
+                                                          initializer=start_fleet_worker,
+                                                          initargs=(self.pickled_program(),))
+                self.fleet_pool_version = self.program_version
+            return self.fleet_executor
+
+    def pickled_program(self):
+        # Every ship without its runtime state, pickled once per program version
+        if self.fleet_program is None or self.fleet_program[0] != self.program_version:
+            ships = []
+            for layout in self.symbol_table.values():
+                members = [{'type': 'variable', 'name': name} for name in layout.fields]
+                members.extend(self.portable(method_node) for method_node in layout.methods.values())
+                ships.append({'type': 'class', 'name': layout.name, 'members': members})
+            self.fleet_program = (self.program_version, pickle.dumps(ships))
+        return self.fleet_program[1]
+
+    def portable(self, node):
+        if isinstance(node, list):
+            return [self.portable(item) for item in node]
+        if isinstance(node, dict):
+            # A lazy body's token list is shared by the whole program; pickle keeps it shared
+            return {key: value if key == 'tokens' else self.portable(value)
+                    for key, value in node.items() if key not in self.RUNTIME_KEYS}
+        return node
+
+    def count_backedges(self, loop_node, frame, iterations):
+        # Counted once per loop exit rather than per iteration
+        profile = frame.method['profile']
+        profile.backedges += iterations
+        profile.loops[loop_node['loop']] += iterations
+        self.metrics.loop_iterations += iterations
+
+    def loop_is_hot(self, frame):
+        # A long-running loop promotes its adventure; the compiled form is used from the next call
+        if frame.method['profile'].state == 'interpreted':
+            self.tier_up(frame.method, frame.instance.layout, 'backedges')
+
+    def execute_expression(self, expression, frame):
+        self.metrics.nodes_evaluated += 1
+        if expression['type'] == 'literal':
+            return expression['value']
+        elif expression['type'] == 'field':
+            return frame.instance[expression['slot']]
+        elif expression['type'] == 'identifier':
+            try:
+                return frame.locals[expression['value']]
+            except KeyError:
+                raise RuntimeError(f"Undefined name: {expression['value']}") from None
+        elif expression['type'] == 'member':
+            return self.member_get(expression, self.execute_expression(expression['object'], frame))
+        elif expression['type'] == 'assignment':
+            return self.execute_assignment(expression, frame)
+        elif expression['type'] == 'logical_or':
+            return self.execute_expression(expression['left'], frame) or self.execute_expression(expression['right'], frame)
+        elif expression['type'] == 'logical_and':
+            return self.execute_expression(expression['left'], frame) and self.execute_expression(expression['right'], frame)
+        elif expression['type'] in ('binary', 'term', 'factor', 'comparison', 'equality'):
+            left = self.execute_expression(expression['left'], frame)
+            right = self.execute_expression(expression['right'], frame)
+            op = self.BINARY_OPERATORS.get(expression['operator'])
+            if op is None:
+                raise RuntimeError(f"Unknown operator: {expression['operator']}")
+            return op(left, right)
+        elif expression['type'] == 'unary':
+            if expression['operator'] == '-':
+                return -self.execute_expression(expression['expression'], frame)
+            elif expression['operator'] == '!':
+                return not self.execute_expression(expression['expression'], frame)
+            else:
+                raise RuntimeError(f"Unknown unary operator: {expression['operator']}")
+        elif expression['type'] == 'call':
+            return self.execute_call(expression, frame)
+        else:
+            raise RuntimeError(f"Unknown expression type: {expression['type']}")
+
+    def member_get(self, member_node, instance):
+        return instance[self.cached_field_offset(member_node, instance)]
+
+    def member_set(self, member_node, instance, value):
+        instance[self.cached_field_offset(member_node, instance)] = value
+        return value
+
+    def cached_field_offset(self, member_node, instance):
+        cache = member_node['cache']
+        offset = cache.lookup(getattr(instance, 'layout', None))
+        if offset is None:
+            offset = self.field_offset(instance, member_node['name'])
+            cache.update(instance.layout, offset)
+        return offset
+
+    def field_offset(self, instance, name):
+        if not isinstance(instance, ShipInstance):
+            raise RuntimeError(f"Cannot access {name} on {instance!r}, it is not a ship")
+        offset = instance.layout.slots.get(name)
+        if offset is None:
+            raise RuntimeError(f"{instance.layout.name} has no treasure {name}")
+        return offset
+
+    def execute_call(self, call_node, frame):
+        callee = call_node['callee']
+        if callee['type'] == 'member':
+            # ship.adventure(...)
+            instance = self.execute_expression(callee['object'], frame)
+            return self.call_member(call_node, instance, [self.execute_expression(arg, frame) for arg in call_node['arguments']])
+        if callee['type'] != 'identifier':
+            raise RuntimeError("Only adventures, ships and builtins can be called")
+        return self.call_local(call_node, frame.instance, [self.execute_expression(arg, frame) for arg in call_node['arguments']])
+
+    def call_member(self, call_node, instance, args):
+        method_node = call_node['cache'].lookup(getattr(instance, 'layout', None))
+        if method_node is None:
+            name = call_node['callee']['name']
+            if not isinstance(instance, ShipInstance):
+                raise RuntimeError(f"Cannot call {name} on {instance!r}, it is not a ship")
+            method_node = instance.layout.methods.get(name)
+            if method_node is None:
+                raise RuntimeError(f"{instance.layout.name} has no adventure {name}")
+            call_node['cache'].update(instance.layout, method_node)
+        return self.invoke(method_node, instance, args)
+
+    def call_local(self, call_node, instance, args, tail=False):
+        layout = instance.layout
+        target = call_node['cache'].lookup(layout)
+        if target is None:
+            # Adventures of this ship first, then ships (launching one), then builtins
+            name = call_node['callee']['value']
+            target = layout.methods.get(name) or self.symbol_table.get(name) or self.BUILTINS.get(name)
+            if target is None:
+                raise RuntimeError(f"Unknown adventure: {name}")
+            call_node['cache'].update(layout, target)
+        if isinstance(target, dict):
+            if tail:
+                return TailCall(target, args)
+            return self.invoke(target, instance, args)
+        if isinstance(target, ShipLayout):
+            if args:
+                raise RuntimeError(f"Ship {call_node['callee']['value']} takes no arguments")
+            return target.instantiate()
+        return target(*args)
+
+    def execute_variable_declaration(self, variable_node, frame):
+        # A treasure declared inside an adventure is a local of that call
+        frame.locals[variable_node['name']] = None
+
+    def execute_assignment(self, assignment_node, frame):
+        left = assignment_node['left']
+        right = self.execute_expression(assignment_node['right'], frame)
+        if left['type'] == 'identifier':
+            frame.locals[left['value']] = right
+        elif left['type'] == 'field':
+            frame.instance[left['slot']] = right
+        elif left['type'] == 'member':
+            self.member_set(left, self.execute_expression(left['object'], frame), right)
+        else:
+            raise RuntimeError("Invalid assignment target")
+        return right
+
+
+class Execution(Interpreter):
+    # One thread's run of a frozen program. Ships, adventure bodies, inline caches,
+    # profiles, compiled tiers and memo tables are shared with the program; metrics,
+    # the call depth and the ships execute_method uses by default are its own. Shared
+    # state is only ever swapped whole (compiled tiers, cache entries) or is a
+    # counter, so the hot path takes no locks.
+    def __init__(self, program):
+        self.__dict__.update(program.__dict__)
+        self.program = program
+        self.metrics = Metrics()
+        self.frame_depth = 0
+        self.ships = {}
+        for name, ship in program.ships.items():
+            instance = ship.layout.instantiate()
+            instance[:] = ship  # starts from the program's treasure, then goes its own way
+            self.ships[name] = instance
+
+    # Worker pools belong to the program, whichever execution starts them
+    compile_executor = property(lambda self: self.program.compile_executor,
+                                lambda self, value: setattr(self.program, 'compile_executor', value))
+    fleet_executor = property(lambda self: self.program.fleet_executor,
+                              lambda self, value: setattr(self.program, 'fleet_executor', value))
+    fleet_program = property(lambda self: self.program.fleet_program,
+                             lambda self, value: setattr(self.program, 'fleet_program', value))
+    fleet_pool_version = property(lambda self: self.program.fleet_pool_version,
+                                  lambda self, value: setattr(self.program, 'fleet_pool_version', value))
+
+
+FLEET_INTERPRETER = None  # the program, inside a fleet worker process
+
+
+def start_fleet_worker(program):
+    # Pool initializer: runs once in each fleet worker process
+    global FLEET_INTERPRETER
+    FLEET_INTERPRETER = Interpreter(Parser([('EOF', 'EOF')]), background_compile=False, fleet_workers=1)
+    for class_node in pickle.loads(program):
+        FLEET_INTERPRETER.interpret_class(class_node)
+
+
+def run_fleet_chunk(ship_name, adventure, index, fields, local_values, start, stop):
+    # Runs inside a worker process, so it has to be a module-level function
+    interpreter = FLEET_INTERPRETER
+    layout = interpreter.symbol_table[ship_name]
+    method_node = layout.methods[adventure]
+    if method_node.get('profile') is None:
+        interpreter.prepare_method(layout, method_node)
+    instance = layout.instantiate()
+    instance[:] = fields
+    interpreter.metrics = Metrics()
+    frame = Frame(instance, local_values, method_node)
+    partials = interpreter.run_fleet_range(method_node['fleets'][index], frame, start, stop)
+    return partials, interpreter.metrics
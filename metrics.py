@@ -0,0 +1,78 @@
+import json
+
+
+class Metrics:
+    # Run counters shared by Lexer, Parser and Interpreter. Plain attributes keep the
+    # hot-path increments cheap; merge() aggregates runs, threads and worker processes.
+    # name -> (kind, help); gauges aggregate with max, everything else sums
+    FIELDS = {
+        'runs': ('counter', 'Adventures started through execute_method'),
+        'tokens_lexed': ('counter', 'Tokens produced by the lexer'),
+        'lex_seconds': ('counter', 'Wall time spent lexing'),
+        'parse_seconds': ('counter', 'Wall time spent parsing, including lazy adventure bodies'),
+        'execute_seconds': ('counter', 'Wall time spent in execute_method'),
+        'nodes_evaluated': ('counter', 'Statements and expressions evaluated by the tree walker'),
+        'loop_iterations': ('counter', 'Loop iterations in both execution tiers'),
+        'calls': ('counter', 'Adventure invocations in both execution tiers'),
+        'peak_frame_depth': ('gauge', 'Deepest adventure call stack seen'),
+    }
+    __slots__ = tuple(FIELDS)
+
+    def __init__(self, **values):
+        for name in self.FIELDS:
+            setattr(self, name, values.get(name, 0))
+
+    def merge(self, other):
+        if isinstance(other, Metrics):
+            other = other.to_dict()
+        for name, (kind, _) in self.FIELDS.items():
+            value = other.get(name, 0)
+            if kind == 'gauge':
+                setattr(self, name, max(getattr(self, name), value))
+            else:
+                setattr(self, name, getattr(self, name) + value)
+        return self
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**values)
+
+    @classmethod
+    def combined(cls, many):
+        total = cls()
+        for metrics in many:
+            total.merge(metrics)
+        return total
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    def to_prometheus(self, prefix='piratespeak', labels=None):
+        label_text = ''
+        if labels:
+            pairs = ','.join(f'{key}="{escape_label(value)}"' for key, value in sorted(labels.items()))
+            label_text = '{' + pairs + '}'
+        lines = []
+        for name, (kind, help_text) in self.FIELDS.items():
+            metric = f"{prefix}_{name}" + ('_total' if kind == 'counter' else '')
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.append(f"{metric}{label_text} {getattr(self, name)}")
+        return '\n'.join(lines) + '\n'
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        for name in self.FIELDS:
+            setattr(self, name, state.get(name, 0))
+
+    def __repr__(self):
+        return f"Metrics({self.to_dict()})"
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -1,271 +1,424 @@
-class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.position = 0
-        self.current_token = self.tokens[self.position]
-
-    def eat(self, token_type):
-        if self.current_token[0] == token_type:
-            self.position += 1
-            self.current_token = self.tokens[self.position]
-        else:
-            raise SyntaxError(f"Expected {token_type}, got {self.current_token[0]}")
-
-    def parse(self):
-        return self.parse_program()
-
-    def parse_program(self):
-        classes = []
-        while self.current_token[0] != 'EOF':
-            classes.append(self.parse_class_declaration())
-        return classes
-
-    def parse_class_declaration(self):
-        self.eat('KEYWORD')  # ship
-        class_name = self.current_token[1]
-        self.eat('IDENTIFIER')
-        self.eat('SYMBOL')  # {
-        members = self.parse_member_declarations()
-        self.eat('SYMBOL')  # }
-        return {'type': 'class', 'name': class_name, 'members': members}
-
-    def parse_member_declarations(self):
-        members = []
-        while self.current_token[0] != 'SYMBOL' or self.current_token[1] != '}':
-            if self.current_token[0] == 'KEYWORD':
-                if self.current_token[1] == 'allHands' or self.current_token[1] == 'officerOnly':
-                    members.append(self.parse_member_declaration())
-            else:
-                break
-        return members
-
-    def parse_member_declaration(self):
-        access_modifier = self.current_token[1]
-        self.eat('KEYWORD')
-        if self.current_token[1] == 'treasure':
-            return self.parse_variable_declaration(access_modifier)
-        elif self.current_token[1] == 'adventure':
-            return self.parse_method_declaration(access_modifier)
-
-    def parse_variable_declaration(self, access_modifier):
-        self.eat('KEYWORD')  # treasure
-        var_type = self.current_token[1]
-        self.eat('TYPE')
-        var_name = self.current_token[1]
-        self.eat('IDENTIFIER')
-        self.eat('SYMBOL')  # ;
-        return {'type': 'variable', 'access': access_modifier, 'var_type': var_type, 'name': var_name}
-
-    def parse_method_declaration(self, access_modifier):
-        self.eat('KEYWORD')  # adventure
-        method_name = self.current_token[1]
-        self.eat('IDENTIFIER')
-        self.eat('SYMBOL')  # (
-        parameters = self.parse_parameter_list()
-        self.eat('SYMBOL')  # )
-        self.eat('SYMBOL')  # {
-        body = self.parse_block_statement()
-        self.eat('SYMBOL')  # }
-        return {'type': 'method', 'access': access_modifier, 'name': method_name, 'params': parameters, 'body': body}
-
-    def parse_parameter_list(self):
-        parameters = []
-        if self.current_token[0] == 'TYPE':
-            parameters.append(self.parse_parameter())
-            while self.current_token[0] == 'SYMBOL' and self.current_token[1] == ',':
-                self.eat('SYMBOL')
-                parameters.append(self.parse_parameter())
-        return parameters
-
-    def parse_parameter(self):
-        param_type = self.current_token[1]
-        self.eat('TYPE')
-        param_name = self.current_token[1]
-        self.eat('IDENTIFIER')
-        return {'type': param_type, 'name': param_name}
-
-    def parse_block_statement(self):
-        statements = []
-        while self.current_token[0] != 'SYMBOL' or self.current_token[1] != '}':
-            statements.append(self.parse_statement())
-        return statements
-
-    def parse_statement(self):
-        if self.current_token[1] == 'treasure':
-            return self.parse_variable_declaration(None)
-        elif self.current_token[1] == 'explore':
-            return self.parse_if_statement()
-        elif self.current_token[1] == 'sail':
-            return self.parse_for_statement()
-        elif self.current_token[1] == 'while':
-            return self.parse_while_statement()
-        elif self.current_token[1] == 'return':
-            return self.parse_return_statement()
-        elif self.current_token[0] == 'SYMBOL' and self.current_token[1] == '{':
-            return self.parse_block_statement()
-        else:
-            return self.parse_expression_statement()
-
-    def parse_if_statement(self):
-        self.eat('KEYWORD')  # explore
-        self.eat('SYMBOL')  # (
-        condition = self.parse_expression()
-        self.eat('SYMBOL')  # )
-        if_body = self.parse_statement()
-        else_body = None
-        if self.current_token[0] == 'KEYWORD' and self.current_token[1] == 'deviate':
-            self.eat('KEYWORD')  # deviate
-            else_body = self.parse_statement()
-        return {'type': 'if', 'condition': condition, 'if_body': if_body, 'else_body': else_body}
-
-    def parse_for_statement(self):
-        self.eat('KEYWORD')  # sail
-        self.eat('SYMBOL')  # (
-        init = None
-        if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ';':
-            init = self.parse_expression()
-        self.eat('SYMBOL')  # ;
-        condition = None
-        if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ';':
-            condition = self.parse_expression()
-        self.eat('SYMBOL')  # ;
-        update = None
-        if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ')':
-            update = self.parse_expression()
-        self.eat('SYMBOL')  # )
-        body = self.parse_statement()
-        return {'type': 'for', 'init': init, 'condition': condition, 'update': update, 'body': body}
-
-    def parse_while_statement(self):
-        self.eat('KEYWORD')  # while
-        self.eat('SYMBOL')  # (
-        condition = self.parse_expression()
-        self.eat('SYMBOL')  # )
-        body = self.parse_statement()
-        return {'type': 'while', 'condition': condition, 'body': body}
-
-    def parse_return_statement(self):
-        self.eat('KEYWORD')  # return
-        expr = None
-        if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ';':
-            expr = self.parse_expression()
-        self.eat('SYMBOL')  # ;
-        return {'type': 'return', 'expression': expr}
-
-    def parse_block_statement(self):
-        self.eat('SYMBOL')  # {
-        statements = []
-        while self.current_token[0] != 'SYMBOL' or self.current_token[1] != '}':
-            statements.append(self.parse_statement())
-        self.eat('SYMBOL')  # }
-        return {'type': 'block', 'statements': statements}
-
-    def parse_expression_statement(self):
-        expr = self.parse_expression()
-        self.eat('SYMBOL')  # ;
-        return {'type': 'expression', 'expression': expr}
-
-    def parse_expression(self):
-        return self.parse_assignment()
-
-    def parse_assignment(self):
-        left = self.parse_logical_or()
-        if self.current_token[0] == 'OPERATOR' and self.current_token[1] == '=':
-            self.eat('OPERATOR')
-            right = self.parse_expression()
-            return {'type': 'assignment', 'left': left, 'right': right}
-        return left
-
-    def parse_logical_or(self):
-        left = self.parse_logical_and()
-        while self.current_token[0] == 'OPERATOR' and self.current_token[1] == '||':
-            self.eat('OPERATOR')
-            right = self.parse_logical_and()
-            left = {'type': 'logical_or', 'left': left, 'right': right}
-        return left
-
-    def parse_logical_and(self):
-        left = self.parse_equality()
-        while self.current_token[0] == 'OPERATOR' and self.current_token[1] == '&&':
-            self.eat('OPERATOR')
-            right = self.parse_equality()
-            left = {'type': 'logical_and', 'left': left, 'right': right}
-        return left
-
-    def parse_equality(self):
-        left = self.parse_comparison()
-        while self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('==', '!='):
-            op = self.current_token[1]
-            self.eat('OPERATOR')
-            right = self.parse_comparison()
-            left = {'type': 'equality', 'operator': op, 'left': left, 'right': right}
-        return left
-
-    def parse_comparison(self):
-        left = self.parse_term()
-        while self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('<', '>', '<=', '>='):
-            op = self.current_token[1]
-            self.eat('OPERATOR')
-            right = self.parse_term()
-            left = {'type': 'comparison', 'operator': op, 'left': left, 'right': right}
-        return left
-
-    def parse_term(self):
-        left = self.parse_factor()
-        while self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('+', '-'):
-            op = self.current_token[1]
-            self.eat('OPERATOR')
-            right = self.parse_factor()
-            left = {'type': 'term', 'operator': op, 'left': left, 'right': right}
-        return left
-
-    def parse_factor(self):
-        left = self.parse_unary()
-        while self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('*', '/'):
-            op = self.current_token[1]
-            self.eat('OPERATOR')
-            right = self.parse_unary()
-            left = {'type': 'factor', 'operator': op, 'left': left, 'right': right}
-        return left
-
-    def parse_unary(self):
-        if self.current_token[0] == 'OPERATOR' and self.current_token[1] in ('!', '-'):
-            op = self.current_token[1]
-            self.eat('OPERATOR')
-            expr = self.parse_unary()
-            return {'type': 'unary', 'operator': op, 'expression': expr}
-        return self.parse_primary()
-
-    def parse_primary(self):
-        if self.current_token[0] == 'NUMBER':
-            value = self.current_token[1]
-            self.eat('NUMBER')
-            return {'type': 'literal', 'value': int(value)}
-        elif self.current_token[0] == 'FLOAT':
-            value = self.current_token[1]
-            self.eat('FLOAT')
-            return {'type': 'literal', 'value': float(value)}
-        elif self.current_token[0] == 'STRING':
-            value = self.current_token[1]
-            self.eat('STRING')
-            return {'type': 'literal', 'value': value}
-        elif self.current_token[0] == 'CHAR':
-            value = self.current_token[1]
-            self.eat('CHAR')
-            return {'type': 'literal', 'value': value}
-        elif self.current_token[0] == 'KEYWORD' and self.current_token[1] in ('aye', 'nay'):
-            value = self.current_token[1]
-            self.eat('KEYWORD')
-            return {'type': 'literal', 'value': value == 'aye'}
-        elif self.current_token[0] == 'IDENTIFIER':
-            value = self.current_token[1]
-            self.eat('IDENTIFIER')
-            return {'type': 'identifier', 'value': value}
-        elif self.current_token[0] == 'SYMBOL' and self.current_token[1] == '(':
-            self.eat('SYMBOL')
-            expr = self.parse_expression()
-            self.eat('SYMBOL')
-            return expr
-        else:
-            raise SyntaxError(f"Unexpected token: {self.current_token}")
-
+import time
+
+from metrics import Metrics
+
+class Parser:
+    # Infix operators: (left binding power, right binding power, node type, keeps operator).
+    # Left-associative operators bind their right operand one step tighter; assignment
+    # is right-associative. A new operator only needs an entry here.
+    INFIX_OPERATORS = {
+        '=': (2, 1, 'assignment', False),
+        '||': (3, 4, 'logical_or', False),
+        '&&': (5, 6, 'logical_and', False),
+        '==': (7, 8, 'equality', True),
+        '!=': (7, 8, 'equality', True),
+        '<': (9, 10, 'comparison', True),
+        '>': (9, 10, 'comparison', True),
+        '<=': (9, 10, 'comparison', True),
+        '>=': (9, 10, 'comparison', True),
+        '+': (11, 12, 'term', True),
+        '-': (11, 12, 'term', True),
+        '*': (13, 14, 'factor', True),
+        '/': (13, 14, 'factor', True),
+    }
+    # Prefix operators bind tighter than any infix operator
+    PREFIX_OPERATORS = {'!': 15, '-': 15}
+    # haul reductions of a fleet loop; max and min are written through the builtins
+    FLEET_REDUCTIONS = ('sum', 'max', 'min')
+    # Shape of the nodes parse() returns; bump it whenever a node gains, loses or
+    # renames a key, so ASTs cached on disk (see project.py) are parsed again
+    AST_VERSION = 1
+
+    def __init__(self, tokens, lazy=False, metrics=None):
+        self.tokens = tokens
+        self.position = 0
+        self.current_token = self.tokens[self.position]
+        self.lazy = lazy  # only brace-match adventure bodies; see parse_method_body
+        self.metrics = metrics if metrics is not None else Metrics()
+
+    def eat(self, token_type):
+        if self.current_token[0] == token_type:
+            self.position += 1
+            self.current_token = self.tokens[self.position]
+        else:
+            raise SyntaxError(f"Expected {token_type}, got {self.current_token[0]}")
+
+    def parse(self):
+        start = time.perf_counter()
+        try:
+            return self.parse_program()
+        finally:
+            self.metrics.parse_seconds += time.perf_counter() - start
+
+    def parse_program(self):
+        classes = []
+        while self.current_token[0] != 'EOF':
+            classes.append(self.parse_class_declaration())
+        return classes
+
+    def parse_class_declaration(self):
+        self.eat('KEYWORD')  # ship
+        class_name = self.current_token[1]
+        self.eat('IDENTIFIER')
+        self.eat('SYMBOL')  # {
+        members = self.parse_member_declarations()
+        self.eat('SYMBOL')  # }
+        return {'type': 'class', 'name': class_name, 'members': members}
+
+    def parse_member_declarations(self):
+        members = []
+        while self.current_token[0] != 'SYMBOL' or self.current_token[1] != '}':
+            if self.current_token[0] == 'KEYWORD':
+                if self.current_token[1] == 'allHands' or self.current_token[1] == 'officerOnly':
+                    members.append(self.parse_member_declaration())
+            else:
+                break
+        return members
+
+    def parse_member_declaration(self):
+        access_modifier = self.current_token[1]
+        self.eat('KEYWORD')
+        if self.current_token[1] == 'treasure':
+            return self.parse_variable_declaration(access_modifier)
+        elif self.current_token[1] == 'adventure':
+            return self.parse_method_declaration(access_modifier)
+        elif self.current_token[1] == 'charted':
+            # A pure adventure whose results are memoized; checked when it first runs
+            self.eat('KEYWORD')  # charted
+            if self.current_token[1] != 'adventure':
+                raise SyntaxError(f"Expected adventure after charted, got {self.current_token[1]}")
+            return self.parse_method_declaration(access_modifier, charted=True)
+
+    def parse_variable_declaration(self, access_modifier):
+        self.eat('KEYWORD')  # treasure
+        var_type = self.current_token[1]
+        self.eat('TYPE')
+        var_name = self.current_token[1]
+        self.eat('IDENTIFIER')
+        self.eat('SYMBOL')  # ;
+        return {'type': 'variable', 'access': access_modifier, 'var_type': var_type, 'name': var_name}
+
+    def parse_method_declaration(self, access_modifier, charted=False):
+        self.eat('KEYWORD')  # adventure
+        method_name = self.current_token[1]
+        self.eat('IDENTIFIER')
+        self.eat('SYMBOL')  # (
+        parameters = self.parse_parameter_list()
+        self.eat('SYMBOL')  # )
+        if self.lazy:
+            start, end = self.skip_block()
+            return {'type': 'method', 'access': access_modifier, 'name': method_name, 'params': parameters, 'body': None,
+                    'charted': charted, 'tokens': self.tokens, 'body_range': (start, end)}
+        body = self.parse_block_statement()
+        return {'type': 'method', 'access': access_modifier, 'name': method_name, 'params': parameters, 'body': body,
+                'charted': charted}
+
+    def skip_block(self):
+        # Brace-match over a block without building any nodes; returns its token range
+        if self.current_token[0] != 'SYMBOL' or self.current_token[1] != '{':
+            raise SyntaxError(f"Expected {{, got {self.current_token[1]}")
+        start = self.position
+        depth = 0
+        while True:
+            token_type, value = self.current_token
+            if token_type == 'EOF':
+                raise SyntaxError("Unterminated block")
+            if token_type == 'SYMBOL':
+                if value == '{':
+                    depth += 1
+                elif value == '}':
+                    depth -= 1
+            self.position += 1
+            self.current_token = self.tokens[self.position]
+            if depth == 0:
+                return start, self.position
+
+    def parse_method_body(self, method_node):
+        # Parses a body skipped in lazy mode; the token list is released once every body is parsed.
+        # A body with a syntax error keeps its range, so every call reports the same error
+        start, end = method_node['body_range']
+        began = time.perf_counter()
+        try:
+            body_parser = Parser(method_node['tokens'][start:end] + [('EOF', 'EOF')])
+            body = body_parser.parse_block_statement()
+        finally:
+            self.metrics.parse_seconds += time.perf_counter() - began
+        del method_node['body_range'], method_node['tokens']
+        return body
+
+    def parse_parameter_list(self):
+        parameters = []
+        if self.current_token[0] == 'TYPE':
+            parameters.append(self.parse_parameter())
+            while self.current_token[0] == 'SYMBOL' and self.current_token[1] == ',':
+                self.eat('SYMBOL')
+                parameters.append(self.parse_parameter())
+        return parameters
+
+    def parse_parameter(self):
+        param_type = self.current_token[1]
+        self.eat('TYPE')
+        param_name = self.current_token[1]
+        self.eat('IDENTIFIER')
+        return {'type': param_type, 'name': param_name}
+
+    def parse_statement(self):
+        if self.current_token[1] == 'treasure':
+            return self.parse_variable_declaration(None)
+        elif self.current_token[1] == 'explore':
+            return self.parse_if_statement()
+        elif self.current_token[1] == 'sail':
+            return self.parse_for_statement()
+        elif self.current_token[1] == 'fleet':
+            return self.parse_fleet_statement()
+        elif self.current_token[1] == 'while':
+            return self.parse_while_statement()
+        elif self.current_token[1] == 'return':
+            return self.parse_return_statement()
+        elif self.current_token[0] == 'SYMBOL' and self.current_token[1] == '{':
+            return self.parse_block_statement()
+        else:
+            return self.parse_expression_statement()
+
+    def parse_if_statement(self):
+        self.eat('KEYWORD')  # explore
+        self.eat('SYMBOL')  # (
+        condition = self.parse_expression()
+        self.eat('SYMBOL')  # )
+        if_body = self.parse_statement()
+        else_body = None
+        if self.current_token[0] == 'KEYWORD' and self.current_token[1] == 'deviate':
+            self.eat('KEYWORD')  # deviate
+            else_body = self.parse_statement()
+        return {'type': 'if', 'condition': condition, 'if_body': if_body, 'else_body': else_body}
+
+    def parse_for_statement(self):
+        self.eat('KEYWORD')  # sail
+        self.eat('SYMBOL')  # (
+        init = None
+        if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ';':
+            init = self.parse_expression()
+        self.eat('SYMBOL')  # ;
+        condition = None
+        if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ';':
+            condition = self.parse_expression()
+        self.eat('SYMBOL')  # ;
+        update = None
+        if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ')':
+            update = self.parse_expression()
+        self.eat('SYMBOL')  # )
+        body = self.parse_statement()
+        return {'type': 'for', 'init': init, 'condition': condition, 'update': update, 'body': body}
+
+    def parse_fleet_statement(self):
+        # fleet sail (i = start; i < stop; i = i + step) haul sum total, max best { ... }
+        self.eat('KEYWORD')  # fleet
+        if self.current_token[1] != 'sail':
+            raise SyntaxError(f"Expected sail after fleet, got {self.current_token[1]}")
+        self.eat('KEYWORD')  # sail
+        self.eat('SYMBOL')  # (
+        init = self.parse_expression()
+        self.eat('SYMBOL')  # ;
+        condition = self.parse_expression()
+        self.eat('SYMBOL')  # ;
+        update = self.parse_expression()
+        self.eat('SYMBOL')  # )
+        reductions = {}
+        if self.current_token[0] == 'KEYWORD' and self.current_token[1] == 'haul':
+            self.eat('KEYWORD')  # haul
+            while True:
+                kind = self.current_token[1]
+                self.eat('IDENTIFIER')
+                if kind not in self.FLEET_REDUCTIONS:
+                    raise SyntaxError(f"Unknown reduction {kind}, expected one of {', '.join(self.FLEET_REDUCTIONS)}")
+                name = self.current_token[1]
+                self.eat('IDENTIFIER')
+                reductions[name] = kind
+                if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ',':
+                    break
+                self.eat('SYMBOL')  # ,
+        body = self.parse_statement()
+        node = self.fleet_range(init, condition, update)
+        node.update({'type': 'fleet', 'reductions': reductions, 'body': body})
+        self.check_fleet_body(body, node, self.declared_names(body, set()))
+        return node
+
+    def fleet_range(self, init, condition, update):
+        # Iterations are split up front, so the header must be a plain counted range
+        if init['type'] != 'assignment' or init['left']['type'] != 'identifier':
+            raise SyntaxError("fleet loop must start with var = start")
+        var = init['left']['value']
+        if (condition['type'] != 'comparison' or condition['operator'] not in ('<', '<=')
+                or condition['left'] != {'type': 'identifier', 'value': var}):
+            raise SyntaxError(f"fleet loop condition must be {var} < stop or {var} <= stop")
+        step = update.get('right', {})
+        if (update['type'] != 'assignment' or update['left'] != {'type': 'identifier', 'value': var}
+                or step.get('operator') != '+' or step['left'] != {'type': 'identifier', 'value': var}
+                or step['right']['type'] != 'literal' or type(step['right']['value']) is not int
+                or step['right']['value'] <= 0):
+            raise SyntaxError(f"fleet loop update must be {var} = {var} + a positive whole number")
+        return {'var': var, 'start': init['right'], 'stop': condition['right'],
+                'inclusive': condition['operator'] == '<=', 'step': step['right']['value']}
+
+    def declared_names(self, node, names):
+        if isinstance(node, list):
+            for item in node:
+                self.declared_names(item, names)
+        elif isinstance(node, dict):
+            if node.get('type') == 'variable':
+                names.add(node['name'])
+            for value in node.values():
+                self.declared_names(value, names)
+        return names
+
+    def check_fleet_body(self, node, fleet, private):
+        # Iterations run out of order in separate processes, so nothing one iteration
+        # writes may be seen by another: the body only assigns the locals it declares
+        # and its haul variables, each in its own reduction form
+        if isinstance(node, list):
+            for item in node:
+                self.check_fleet_body(item, fleet, private)
+            return
+        if not isinstance(node, dict):
+            return
+        kind = node.get('type')
+        if kind == 'return':
+            raise SyntaxError("fleet loop body cannot return")
+        elif kind == 'assignment':
+            target = node['left']
+            if target['type'] == 'member':
+                raise SyntaxError(f"fleet loop body cannot assign .{target['name']} of another ship")
+            if target['type'] != 'identifier':
+                raise SyntaxError("fleet loop body cannot assign to this expression")
+            name = target['value']
+            if name in fleet['reductions']:
+                self.check_fleet_body(self.reduction_operand(node, name, fleet['reductions'][name]), fleet, private)
+                return
+            if name == fleet['var']:
+                raise SyntaxError(f"fleet loop body cannot assign its loop variable {name}")
+            if name not in private:
+                raise SyntaxError(f"fleet loop body assigns {name}, which outlives an iteration; declare it in the body or haul it")
+        elif kind == 'identifier' and node['value'] in fleet['reductions']:
+            raise SyntaxError(f"fleet loop body reads {node['value']} outside its {fleet['reductions'][node['value']]} reduction")
+        for value in node.values():
+            self.check_fleet_body(value, fleet, private)
+
+    def reduction_operand(self, assignment, name, kind):
+        # total = total + e for sum, best = max(best, e) for max and min
+        value = assignment['right']
+        own = {'type': 'identifier', 'value': name}
+        if kind == 'sum':
+            if value.get('operator') == '+' and value['left'] == own:
+                return value['right']
+            raise SyntaxError(f"fleet loop can only update {name} as {name} = {name} + ...")
+        if (value['type'] == 'call' and value['callee'] == {'type': 'identifier', 'value': kind}
+                and len(value['arguments']) == 2 and value['arguments'][0] == own):
+            return value['arguments'][1]
+        raise SyntaxError(f"fleet loop can only update {name} as {name} = {kind}({name}, ...)")
+
+    def parse_while_statement(self):
+        self.eat('KEYWORD')  # while
+        self.eat('SYMBOL')  # (
+        condition = self.parse_expression()
+        self.eat('SYMBOL')  # )
+        body = self.parse_statement()
+        return {'type': 'while', 'condition': condition, 'body': body}
+
+    def parse_return_statement(self):
+        self.eat('KEYWORD')  # return
+        expr = None
+        if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ';':
+            expr = self.parse_expression()
+        self.eat('SYMBOL')  # ;
+        return {'type': 'return', 'expression': expr}
+
+    def parse_block_statement(self):
+        self.eat('SYMBOL')  # {
+        statements = []
+        while self.current_token[0] != 'SYMBOL' or self.current_token[1] != '}':
+            statements.append(self.parse_statement())
+        self.eat('SYMBOL')  # }
+        return {'type': 'block', 'statements': statements}
+
+    def parse_expression_statement(self):
+        expr = self.parse_expression()
+        self.eat('SYMBOL')  # ;
+        return {'type': 'expression', 'expression': expr}
+
+    def parse_expression(self, min_binding_power=0):
+        left = self.parse_postfix(self.parse_unary())
+        while self.current_token[0] == 'OPERATOR':
+            op = self.current_token[1]
+            entry = self.INFIX_OPERATORS.get(op)
+            if entry is None or entry[0] <= min_binding_power:
+                break
+            _, right_binding_power, node_type, keeps_operator = entry
+            self.eat('OPERATOR')
+            right = self.parse_expression(right_binding_power)
+            if keeps_operator:
+                left = {'type': node_type, 'operator': op, 'left': left, 'right': right}
+            else:
+                left = {'type': node_type, 'left': left, 'right': right}
+        return left
+
+    def parse_unary(self):
+        if self.current_token[0] == 'OPERATOR' and self.current_token[1] in self.PREFIX_OPERATORS:
+            op = self.current_token[1]
+            self.eat('OPERATOR')
+            expr = self.parse_expression(self.PREFIX_OPERATORS[op])
+            return {'type': 'unary', 'operator': op, 'expression': expr}
+        return self.parse_primary()
+
+    def parse_postfix(self, expr):
+        # Calls and member access bind tighter than every prefix and infix operator
+        while self.current_token[0] == 'SYMBOL' and self.current_token[1] in ('(', '.'):
+            if self.current_token[1] == '.':
+                self.eat('SYMBOL')  # .
+                name = self.current_token[1]
+                self.eat('IDENTIFIER')
+                expr = {'type': 'member', 'object': expr, 'name': name}
+                continue
+            self.eat('SYMBOL')  # (
+            arguments = []
+            if self.current_token[0] != 'SYMBOL' or self.current_token[1] != ')':
+                arguments.append(self.parse_expression())
+                while self.current_token[0] == 'SYMBOL' and self.current_token[1] == ',':
+                    self.eat('SYMBOL')
+                    arguments.append(self.parse_expression())
+            self.eat('SYMBOL')  # )
+            expr = {'type': 'call', 'callee': expr, 'arguments': arguments}
+        return expr
+
+    def parse_primary(self):
+        if self.current_token[0] == 'NUMBER':
+            value = self.current_token[1]
+            self.eat('NUMBER')
+            return {'type': 'literal', 'value': int(value)}
+        elif self.current_token[0] == 'FLOAT':
+            value = self.current_token[1]
+            self.eat('FLOAT')
+            return {'type': 'literal', 'value': float(value)}
+        elif self.current_token[0] == 'STRING':
+            value = self.current_token[1]
+            self.eat('STRING')
+            return {'type': 'literal', 'value': value[1:-1]}
+        elif self.current_token[0] == 'CHAR':
+            value = self.current_token[1]
+            self.eat('CHAR')
+            return {'type': 'literal', 'value': value[1:-1]}
+        elif self.current_token[0] == 'KEYWORD' and self.current_token[1] in ('aye', 'nay'):
+            value = self.current_token[1]
+            self.eat('KEYWORD')
+            return {'type': 'literal', 'value': value == 'aye'}
+        elif self.current_token[0] == 'IDENTIFIER':
+            value = self.current_token[1]
+            self.eat('IDENTIFIER')
+            return {'type': 'identifier', 'value': value}
+        elif self.current_token[0] == 'SYMBOL' and self.current_token[1] == '(':
+            self.eat('SYMBOL')
+            expr = self.parse_expression()
+            self.eat('SYMBOL')
+            return expr
+        else:
+            raise SyntaxError(f"Unexpected token: {self.current_token}")
+
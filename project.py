@@ -0,0 +1,128 @@
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from PirateSpeak import Lexer, Parser
+
+SOURCE_SUFFIX = '.ps'
+
+
+def parse_file(path):
+    # Runs inside a worker process, so it has to be a module-level function
+    with open(path, encoding='utf-8') as f:
+        code = f.read()
+    try:
+        return Parser(Lexer(code).get_tokens()).parse()
+    except SyntaxError as e:
+        raise SyntaxError(f"{path}: {e}") from None
+
+
+def parse_file_pickled(path):
+    # Workers hand back the pickle the cache keeps anyway, rather than ships that are
+    # pickled to cross the process boundary and then again for the cache
+    return pickle.dumps(parse_file(path), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class Project:
+    def __init__(self, root, workers=None, cache_dir=None):
+        self.root = root
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        # path -> (stat key, pickled ships parsed from it). Interpreters rewrite the AST
+        # they run (field offsets, profiles, memo tables, compiled code), so every
+        # parse() unpickles fresh ships rather than sharing one set of dicts
+        self.cache = {}
+        self.executor = None
+        self.stats = {'files': 0, 'parsed': 0, 'cached': 0}
+
+    def discover(self):
+        paths = []
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith(SOURCE_SUFFIX):
+                    paths.append(os.path.join(directory, filename))
+        return paths
+
+    def parse(self):
+        # Same interface as Parser.parse, so Interpreter(Project(root)) works
+        paths = self.discover()
+        stale = []
+        for path in paths:
+            st = os.stat(path)
+            key = (st.st_mtime_ns, st.st_size)
+            cached = self.cache.get(path) or self.load_cached(path)
+            if cached is not None and cached[0] == key:
+                self.cache[path] = cached
+            else:
+                stale.append((path, key))
+
+        # Largest files first, so the slowest parse never starts last
+        stale.sort(key=lambda item: item[1][1], reverse=True)
+        for (path, key), data in zip(stale, self.parse_files([path for path, _ in stale])):
+            self.cache[path] = (key, data)
+            self.store_cached(path, key, data)
+
+        self.stats = {'files': len(paths), 'parsed': len(stale), 'cached': len(paths) - len(stale)}
+        return self.merge(paths)
+
+    def parse_files(self, paths):
+        if self.workers == 1 or len(paths) < 2:
+            return [parse_file_pickled(path) for path in paths]
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return list(self.executor.map(parse_file_pickled, paths))
+
+    def merge(self, paths):
+        program = []
+        defined_in = {}
+        for path in paths:
+            for ship in pickle.loads(self.cache[path][1]):
+                name = ship['name']
+                if name in defined_in:
+                    raise SyntaxError(f"Duplicate ship {name} in {path} (already defined in {defined_in[name]})")
+                defined_in[name] = path
+                program.append(ship)
+        return program
+
+    def cache_path(self, path):
+        digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + '.pickle')
+
+    def load_cached(self, path):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self.cache_path(path), 'rb') as f:
+                version, key, data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return None
+        if version != Parser.AST_VERSION:
+            return None  # written by a parser that built differently shaped nodes
+        return key, data
+
+    def store_cached(self, path, key, data):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self.cache_path(path) + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump((Parser.AST_VERSION, key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.cache_path(path))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_project(root, workers=None, cache_dir=None):
+    with Project(root, workers, cache_dir) as project:
+        return project.parse()
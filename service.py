@@ -0,0 +1,329 @@
+# Long-running execution service: keeps parsed (and, once hot, compiled) programs
+# warm in a pool of worker processes and runs adventures for clients over a Unix
+# socket using newline-delimited JSON.
+#
+#   python service.py serve --socket /tmp/piratespeak.sock --workers 4
+#   python service.py bench --socket /tmp/piratespeak.sock -n 5000 -c 4
+#
+# Requests:
+#   {"op": "load", "source": "..."}                      -> {"ok": true, "program": "<sha256>"}
+#   {"op": "run", "program": "<sha256>", "ship": "S", "adventure": "a", "args": [1],
+#    "limits": {"timeout": 1.0, "max_output": 65536}}    -> {"ok": true, "result": ..., "output": "..."}
+#   {"op": "metrics"}                                    -> {"ok": true, "metrics": {...}}
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import statistics
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import Metrics
+from PirateSpeak import Interpreter, Lexer, Parser
+
+DEFAULT_LIMITS = {'timeout': 5.0, 'max_output': 1 << 20}
+MAX_TIMEOUT = 24 * 3600.0  # well inside what setitimer accepts
+PROGRAM_CACHE_SIZE = 64
+
+# Per worker process: program hash -> warm Interpreter
+programs = OrderedDict()
+
+
+class RequestTimeout(Exception):
+    pass
+
+
+def start_worker(memory_limit):
+    # Workers are left running between requests, so they get a hard memory cap
+    # instead of one per request
+    if memory_limit:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    signal.signal(signal.SIGALRM, raise_timeout)
+
+
+def raise_timeout(signum, frame):
+    raise RequestTimeout()
+
+
+def warm_program(program_hash, source):
+    interpreter = programs.get(program_hash)
+    if interpreter is None:
+        metrics = Metrics()
+        interpreter = Interpreter(Parser(Lexer(source, metrics).get_tokens(), lazy=True, metrics=metrics))
+        interpreter.interpret()
+        programs[program_hash] = interpreter
+        if len(programs) > PROGRAM_CACHE_SIZE:
+            programs.popitem(last=False)
+    else:
+        programs.move_to_end(program_hash)
+    return interpreter
+
+
+class CappedOutput(io.TextIOBase):
+    # stdout for one request: keeps the first max_output characters and drops the rest,
+    # so a program printing in a loop cannot grow the worker toward its memory limit
+    def __init__(self, max_output):
+        self.parts = []
+        self.room = max_output
+        self.truncated = False
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if len(text) > self.room:
+            text = text[:self.room]
+            self.truncated = True
+        if text:
+            self.parts.append(text)
+            self.room -= len(text)
+        return len(text)
+
+    def getvalue(self):
+        return ''.join(self.parts)
+
+
+def run_request(program_hash, source, ship, adventure, args, limits):
+    # Runs in a worker process; every request gets fresh ship instances
+    # Report lexing and parsing too when this request is the one warming the program
+    before = programs[program_hash].metrics.to_dict() if program_hash in programs else Metrics().to_dict()
+    output = CappedOutput(limits['max_output'])
+    signal.setitimer(signal.ITIMER_REAL, limits['timeout'])
+    try:
+        interpreter = warm_program(program_hash, source)
+        with contextlib.redirect_stdout(output):
+            result = interpreter.execute_method(ship, adventure, args, interpreter.new_instance(ship))
+        response = {'ok': True, 'result': result}
+    except RequestTimeout:
+        response = {'ok': False, 'error': f"timed out after {limits['timeout']}s"}
+    except (RuntimeError, SyntaxError, ArithmeticError, TypeError, RecursionError, MemoryError) as e:
+        response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    if output.truncated:
+        response['truncated'] = True
+    response['output'] = output.getvalue()
+    interpreter = programs.get(program_hash)
+    after = interpreter.metrics.to_dict() if interpreter is not None else before
+    delta = {name: after[name] - before[name] for name in after}
+    delta['peak_frame_depth'] = after['peak_frame_depth']
+    return response, delta
+
+
+def check_limits(limits):
+    # Client-supplied, so checked before a worker hands them to setitimer; a ValueError
+    # becomes a bad request reply
+    if not isinstance(limits, dict):
+        raise ValueError("limits must be an object")
+    unknown = set(limits) - set(DEFAULT_LIMITS)
+    if unknown:
+        raise ValueError(f"unknown limits {sorted(unknown)}")
+    limits = dict(DEFAULT_LIMITS, **limits)
+    timeout = limits['timeout']
+    if type(timeout) not in (int, float) or not 0 < timeout <= MAX_TIMEOUT:
+        raise ValueError(f"timeout must be a number of seconds in (0, {MAX_TIMEOUT:g}], got {timeout!r}")
+    if type(limits['max_output']) is not int or limits['max_output'] < 0:
+        raise ValueError(f"max_output must be a non-negative integer, got {limits['max_output']!r}")
+    return limits
+
+
+class Service:
+    def __init__(self, workers=None, memory_limit=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=start_worker, initargs=(memory_limit,))
+        # program hash -> source, least recently used first; bounded like the workers' programs
+        self.sources = OrderedDict()
+        self.sources_lock = threading.Lock()
+        self.metrics = Metrics()
+        self.metrics_lock = threading.Lock()
+
+    def handle(self, request):
+        op = request.get('op')
+        if op == 'load':
+            try:
+                return {'ok': True, 'program': self.load(request['source'])}
+            except SyntaxError as e:
+                return {'ok': False, 'error': f"SyntaxError: {e}"}
+        if op == 'run':
+            try:
+                program_hash = request.get('program') or self.load(request['source'])
+            except SyntaxError as e:
+                return {'ok': False, 'error': f"SyntaxError: {e}"}
+            source = self.source(program_hash)
+            if source is None:
+                return {'ok': False, 'error': f"unknown program {program_hash}; load it (again)"}
+            limits = check_limits(request.get('limits', {}))
+            future = self.executor.submit(run_request, program_hash, source, request['ship'],
+                                          request['adventure'], request.get('args', []), limits)
+            response, delta = future.result()
+            with self.metrics_lock:
+                self.metrics.merge(delta)
+            return response
+        if op == 'metrics':
+            with self.metrics_lock:
+                return {'ok': True, 'metrics': self.metrics.to_dict()}
+        return {'ok': False, 'error': f"unknown op {op!r}"}
+
+    def load(self, source):
+        program_hash = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        if self.source(program_hash) is None:
+            # Parsed in full once here, so a syntax error is reported by load rather
+            # than by the first run of the adventure it is in
+            Parser(Lexer(source).get_tokens()).parse()
+            with self.sources_lock:
+                self.sources[program_hash] = source
+                if len(self.sources) > PROGRAM_CACHE_SIZE:
+                    self.sources.popitem(last=False)
+        return program_hash
+
+    def source(self, program_hash):
+        with self.sources_lock:
+            source = self.sources.get(program_hash)
+            if source is not None:
+                self.sources.move_to_end(program_hash)
+            return source
+
+    def warm_up(self):
+        # Fork the workers now rather than on the first request
+        list(self.executor.map(abs, range(self.workers)))
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.service.handle(json.loads(line))
+            except (ValueError, KeyError) as e:
+                response = {'ok': False, 'error': f"bad request: {e}"}
+            except Exception as e:
+                # Anything a worker raised (or a crashed worker pool): the client still gets a reply
+                response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response, default=repr).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path, workers=None, memory_limit=None):
+    if os.path.exists(path):
+        os.unlink(path)
+    service = Service(workers, memory_limit)
+    service.warm_up()
+    with Server(path, RequestHandler) as server:
+        server.service = service
+        print(f"piratespeak service listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.close()
+            os.unlink(path)
+
+
+class Client:
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.file = self.sock.makefile('rwb')
+
+    def request(self, **request):
+        self.file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def load(self, source):
+        response = self.request(op='load', source=source)
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response['program']
+
+    def run(self, program, ship, adventure, args=(), **limits):
+        return self.request(op='run', program=program, ship=ship, adventure=adventure, args=list(args), limits=limits)
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+BENCH_PROGRAM = '''
+ship Purser {
+    allHands treasure coin ledger;
+
+    allHands adventure share(coin gold, coin crew) {
+        ledger = gold / crew;
+        explore (ledger > 10) { return ledger - 1; }
+        return ledger;
+    }
+}
+'''
+
+
+def bench(path, requests, concurrency):
+    program = Client(path).load(BENCH_PROGRAM)
+    latencies = []
+    errors = []
+
+    def worker(count):
+        client = Client(path)
+        for i in range(count):
+            start = time.perf_counter()
+            response = client.run(program, 'Purser', 'share', [100 + i, 4])
+            latencies.append(time.perf_counter() - start)
+            if not response['ok']:
+                errors.append(response['error'])
+        client.close()
+
+    per_thread = requests // concurrency
+    threads = [threading.Thread(target=worker, args=(per_thread,)) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests, concurrency {concurrency}, {len(latencies) / elapsed:.0f} req/s")
+    print(f"median {statistics.median(latencies) * 1e6:.0f} us, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1e6:.0f} us, max {latencies[-1] * 1e6:.0f} us")
+    if errors:
+        print(f"{len(errors)} errors, first: {errors[0]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PirateSpeak execution service')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve')
+    serve_parser.add_argument('--socket', default='/tmp/piratespeak.sock')
+    serve_parser.add_argument('--workers', type=int)
+    serve_parser.add_argument('--memory-mb', type=int, help='address-space limit per worker')
+    bench_parser = commands.add_parser('bench')
+    bench_parser.add_argument('--socket', default='/tmp/piratespeak.sock')
+    bench_parser.add_argument('-n', '--requests', type=int, default=2000)
+    bench_parser.add_argument('-c', '--concurrency', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        serve(args.socket, args.workers, args.memory_mb and args.memory_mb << 20)
+    else:
+        bench(args.socket, args.requests, args.concurrency)
+
+
+if __name__ == '__main__':
+    main()
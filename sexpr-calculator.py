@@ -1,128 +1,497 @@
-
-def skip_space(s, idx):
-    while idx<len(s) and s[idx].isspace():
-        idx+=1
-    return idx
-
-#as we are going to evaluate the parsed s-expr, it makes sense to extract values such as numbers and strings from atoms. The “val” string at the list head is for distinguishing parsed values (numbers) from other atoms (symbol).
-
-#a placeholder for now
-def parse_atom(s):
-    # TODO: actually implement this
-    import json
-    try:
-        return ['val', json.loads(s)]  #checks if valid json datatype and adds val tag to it... '""' also works - valid json string
-    except json.JSONDecodeError:
-        return s
-
-
-
-'''The function parse_expr take the input string and the current offset (idx) into the input as arguments. It advances the offset during parsing until an error is encountered or the sexpr is terminated.
-
-To parse an sexpr, the first step is to determine whether it's an atom or a list, this is done by looking at the first non-whitespace character.'''
-
-def parse_expr(s: str, idx: int):
-    idx = skip_space(s, idx)
-    if s[idx]=="(":
-        #a list... parse recursively until a closing paranthesis is found
-        idx +=1 #else will keep detecting ( over and over again as s[idx].isspace() wont work and wil keep returning index of the first opening paranthesis
-        l = []
-        while True:   #runs till s[idx]=")" is reached
-            idx = skip_space(s,idx)
-            if idx > len(s):
-                raise Exception("unbalanced paranthesis")
-            
-            if s[idx] == ")":   
-                idx +=1  #why?
-                break
-
-            idx, v = parse_expr(s,idx)  #  calls the parse_expr function with the arguments s and idx, and it expects that the function returns a tuple with two elements. The returned tuple is then unpacked into the variables idx and v.
-
-            l.append(v)
-
-        return idx, l
-
-    elif s[idx]==")":
-        raise Exception("bad paranthesis,  ')' without matching '(' ")
-    else:
-        #an atom...
-        start = idx
-        while idx<len(s) and (not s[idx].isspace()) and s[idx] not in '()':
-            idx+=1
-        if start == idx:
-            raise Exception("empty program")
-        
-        return idx, parse_atom(s[start:idx])
-
-
-#we need to check that the input is fully exhausted:
-def pl_parse(s):
-    idx, node = parse_expr(s,0)
-    idx = skip_space(s, idx)
-    if idx < len(s):
-        raise ValueError('trailing garbage')
-    return node
-
-    
-def pl_eval(node):
-    if len(node) == 0:
-        raise ValueError("empty list")
-
-    if len(node) == 2 and node[0] == "val":
-        return node[1]
-    
-    #binary operators
-    import operator
-    binops = {
-        '+':operator.add,
-        '-':operator.sub,
-        '*':operator.mul,
-        '/':operator.truediv,
-        'eq':operator.eq,
-        'ne':operator.ne,
-        'ge':operator.ge,
-        'gt':operator.gt,
-        'le':operator.le,
-        'lt':operator.lt,
-        'and':operator.and_,
-        'or':operator.or_
-    }
-
-    if len(node)==3 and node[0] in binops:
-        op = binops[node[0]]
-        return op(pl_eval(node[1]), pl_eval(node[2]))
-    
-    #unary operators (single oprand)
-    unops = {
-        '-': operator.neg,
-        'not': operator.not_,
-    }
-
-
-    if len(node)==2 and node[0] in unops:
-        op = unops[node[0]]
-        return op(pl_eval(node[1]))
-    
-    if len(node) == 4 and node[0] == '?':
-        _, cond, yes, no = node         #unpacks the four elements of node into variables
-        if pl_eval(cond):
-            return pl_eval(yes)
-        else:
-            return pl_eval(no)
-
-    # print
-    if node[0] == 'print':
-        return print(*(pl_eval(val) for val in node[1:]))
-
-    raise ValueError('unknown expression')
-
-
-def test_eval():
-    def f(s):
-        return pl_eval(pl_parse(s))
-    print(f('1'))
-    print(f('(+ 1 3)') )
-    print(f('(? (lt 1 3) "yes" "no")'))
-    f('(print  "divij" 21 1)')
-
-test_eval()
+
+def skip_space(s, idx):
+    while idx<len(s) and s[idx].isspace():
+        idx+=1
+    return idx
+
+#as we are going to evaluate the parsed s-expr, it makes sense to extract values such as numbers and strings from atoms. The “val” string at the list head is for distinguishing parsed values (numbers) from other atoms (symbol).
+
+#atoms are classified by looking at their first character instead of round-tripping every symbol through json.loads and catching the exception.
+import json
+import re
+
+_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?\Z')
+_CONSTANTS = {'true': True, 'false': False, 'null': None,
+              'NaN': float('nan'), 'Infinity': float('inf'), '-Infinity': float('-inf')}
+
+def parse_atom(s):
+    c = s[0]
+    if c == '"':
+        if len(s) > 1 and s[-1] == '"' and '\\' not in s:
+            return ['val', s[1:-1]]   #plain strings need no unescaping
+        return ['val', json.loads(s)]
+    if c.isdigit() or (c == '-' and len(s) > 1 and s[1].isdigit()):
+        m = _NUMBER.match(s)
+        if m:
+            if m.group(1) or m.group(2):
+                return ['val', float(s)]
+            return ['val', int(s)]
+        return s
+    if s in _CONSTANTS:
+        return ['val', _CONSTANTS[s]]
+    if c in '[{':
+        try:
+            return ['val', json.loads(s)]
+        except json.JSONDecodeError:
+            return s
+    return s
+
+
+
+'''The function parse_expr take the input string and the current offset (idx) into the input as arguments. It advances the offset during parsing until an error is encountered or the sexpr is terminated.
+
+To parse an sexpr, the first step is to determine whether it's an atom or a list, this is done by looking at the first non-whitespace character.'''
+
+def parse_expr(s: str, idx: int):
+    idx = skip_space(s, idx)
+    if s[idx]=="(":
+        #a list... parse recursively until a closing paranthesis is found
+        idx +=1 #else will keep detecting ( over and over again as s[idx].isspace() wont work and wil keep returning index of the first opening paranthesis
+        l = []
+        while True:   #runs till s[idx]=")" is reached
+            idx = skip_space(s,idx)
+            if idx > len(s):
+                raise Exception("unbalanced paranthesis")
+            
+            if s[idx] == ")":   
+                idx +=1  #why?
+                break
+
+            idx, v = parse_expr(s,idx)  #  calls the parse_expr function with the arguments s and idx, and it expects that the function returns a tuple with two elements. The returned tuple is then unpacked into the variables idx and v.
+
+            l.append(v)
+
+        return idx, l
+
+    elif s[idx]==")":
+        raise Exception("bad paranthesis,  ')' without matching '(' ")
+    else:
+        #an atom...
+        start = idx
+        while idx<len(s) and (not s[idx].isspace()) and s[idx] not in '()':
+            idx+=1
+        if start == idx:
+            raise Exception("empty program")
+        
+        return idx, parse_atom(s[start:idx])
+
+
+#we need to check that the input is fully exhausted:
+def pl_parse(s):
+    nodes = iter_sexprs(s)
+    node = next(nodes, None)
+    if node is None:
+        raise ReadError("empty program", 0)
+    if next(nodes, None) is not None:
+        raise ValueError('trailing garbage')
+    return node
+
+
+'''The streaming reader below replaces the recursion in parse_expr with an explicit stack of open lists, so nesting depth is only limited by memory. It reads any number of top-level expressions from a string, a file (text or binary) or an iterator of chunks, and yields each one as soon as its closing paranthesis is seen - only the expression currently being built is kept in memory.'''
+
+class ReadError(ValueError):
+    def __init__(self, message, offset):
+        super().__init__(f"{message} at byte {offset}")
+        self.offset = offset
+
+
+def _chunks(source, chunk_size):
+    import codecs
+    if isinstance(source, (str, bytes)):
+        source = [source]
+    elif hasattr(source, 'read'):
+        f = source
+        source = iter(lambda: f.read(chunk_size), f.read(0))
+    decoder = None
+    for chunk in source:
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = decoder.decode(chunk)
+        if chunk:
+            yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+
+def iter_sexprs(source, chunk_size=65536):
+    stack = []     #lists under construction, innermost last
+    opened = []    #byte offset of the '(' that opened each of them
+    buf = ''       #unconsumed text; only ever holds one partial atom between chunks
+    pos = 0        #byte offset of buf[i] in the whole input
+    chunks = _chunks(source, chunk_size)
+    done = False
+
+    while not done:
+        chunk = next(chunks, None)
+        if chunk is None:
+            done = True
+        else:
+            buf += chunk
+        ascii = buf.isascii()   #lets byte offsets advance one per character
+        n = len(buf)
+        i = 0
+        while i < n:
+            c = buf[i]
+            if c.isspace():
+                i += 1
+                pos += 1 if ascii else len(c.encode('utf-8'))
+            elif c == '(':
+                stack.append([])
+                opened.append(pos)
+                i += 1
+                pos += 1
+            elif c == ')':
+                if not stack:
+                    raise ReadError("bad paranthesis, ')' without matching '('", pos)
+                node = stack.pop()
+                opened.pop()
+                i += 1
+                pos += 1
+                if stack:
+                    stack[-1].append(node)
+                else:
+                    yield node
+            else:
+                start = i
+                if c == '"':
+                    i += 1
+                    while i < n and buf[i] != '"':
+                        i += 2 if buf[i] == '\\' else 1
+                    if i >= n:
+                        if not done:
+                            i = start
+                            break    #the string continues in the next chunk
+                        raise ReadError("unterminated string", pos)
+                    i += 1
+                else:
+                    while i < n and not buf[i].isspace() and buf[i] not in '()':
+                        i += 1
+                    if i == n and not done:
+                        i = start
+                        break    #the atom may continue in the next chunk
+                text = buf[start:i]
+                try:
+                    atom = parse_atom(text)
+                except json.JSONDecodeError:
+                    raise ReadError("bad atom", pos) from None
+                pos += len(text) if ascii else len(text.encode('utf-8'))
+                if stack:
+                    stack[-1].append(atom)
+                else:
+                    yield atom
+        buf = buf[i:]
+    if stack:
+        raise ReadError("unbalanced paranthesis, '(' never closed", opened[-1])
+
+
+def pl_parse_file(path, chunk_size=65536):
+    with open(path, 'rb') as f:
+        yield from iter_sexprs(f, chunk_size)
+
+    
+#binary operators
+import operator
+BINOPS = {
+    '+':operator.add,
+    '-':operator.sub,
+    '*':operator.mul,
+    '/':operator.truediv,
+    'eq':operator.eq,
+    'ne':operator.ne,
+    'ge':operator.ge,
+    'gt':operator.gt,
+    'le':operator.le,
+    'lt':operator.lt,
+    'and':operator.and_,
+    'or':operator.or_
+}
+
+#unary operators (single oprand)
+UNOPS = {
+    '-': operator.neg,
+    'not': operator.not_,
+}
+
+
+def pl_eval(node):
+    if len(node) == 0:
+        raise ValueError("empty list")
+
+    if len(node) == 2 and node[0] == "val":
+        return node[1]
+    
+    if len(node)==3 and node[0] in BINOPS:
+        op = BINOPS[node[0]]
+        return op(pl_eval(node[1]), pl_eval(node[2]))
+    
+    if len(node)==2 and node[0] in UNOPS:
+        op = UNOPS[node[0]]
+        return op(pl_eval(node[1]))
+    
+    if len(node) == 4 and node[0] == '?':
+        _, cond, yes, no = node         #unpacks the four elements of node into variables
+        if pl_eval(cond):
+            return pl_eval(yes)
+        else:
+            return pl_eval(no)
+
+    # print
+    if node[0] == 'print':
+        return print(*(pl_eval(val) for val in node[1:]))
+
+    raise ValueError('unknown expression')
+
+
+'''Formula sets tend to repeat the same subtrees many times. SexprDAG hash-conses parsed nodes: every structurally identical subtree is interned into one shared tuple, so a batch of formulas becomes a DAG. eval_batch then evaluates each distinct pure subtree once per batch and reuses the result wherever it is shared. Anything containing a print is impure and always re-evaluated.'''
+
+class SexprDAG:
+    def __init__(self):
+        self.table = {}        #structural key -> interned node
+        self.impure = set()    #ids of interned nodes that contain a print
+        self.nodes_seen = 0
+        self.evaluations = 0
+        self.cache_hits = 0
+
+    def _intern_leaf(self, node):
+        if isinstance(node, str):
+            key = ('sym', node)
+        else:
+            value = node[1]
+            try:
+                key = ('val', type(value), value)   #keeps 1, 1.0 and true apart
+                hash(key)
+            except TypeError:
+                return ('val', value)   #unhashable json values are not shared
+        interned = self.table.get(key)
+        if interned is None:
+            interned = node if isinstance(node, str) else ('val', node[1])
+            self.table[key] = interned
+        return interned
+
+    def intern(self, node):
+        #post-order walk with an explicit stack, so deep trees are fine here too
+        stack = [(node, False)]
+        done = []
+        while stack:
+            n, expanded = stack.pop()
+            if not expanded:
+                self.nodes_seen += 1
+            if isinstance(n, str) or (len(n) == 2 and n[0] == 'val'):
+                done.append(self._intern_leaf(n))
+            elif not expanded:
+                stack.append((n, True))
+                for child in reversed(n):
+                    stack.append((child, False))
+            else:
+                count = len(n)
+                kids = tuple(done[len(done) - count:])
+                del done[len(done) - count:]
+                key = ('list',) + tuple(id(k) for k in kids)   #children are interned, so identity is structure
+                interned = self.table.get(key)
+                if interned is None:
+                    interned = kids
+                    self.table[key] = interned
+                    if (kids and kids[0] == 'print') or any(id(k) in self.impure for k in kids):
+                        self.impure.add(id(interned))
+                done.append(interned)
+        return done[0]
+
+    def intern_all(self, source):
+        return [self.intern(node) for node in iter_sexprs(source)]
+
+    def eval_batch(self, roots):
+        memo = {}   #id(node) -> value, only valid for this batch
+        return [self._eval(root, memo) for root in roots]
+
+    def _eval(self, root, memo):
+        stack = [(root, 0)]
+        values = []
+        while stack:
+            node, state = stack.pop()
+            if state == 0:
+                if isinstance(node, str):
+                    raise ValueError('unknown expression')
+                if len(node) == 0:
+                    raise ValueError("empty list")
+                if len(node) == 2 and node[0] == 'val':
+                    values.append(node[1])
+                    continue
+                if id(node) in memo:
+                    self.cache_hits += 1
+                    values.append(memo[id(node)])
+                    continue
+                self.evaluations += 1
+                head = node[0]
+                if len(node) == 4 and head == '?':
+                    stack.append((node, 1))
+                    stack.append((node[1], 0))
+                    continue
+                if not ((len(node) == 3 and head in BINOPS) or (len(node) == 2 and head in UNOPS) or head == 'print'):
+                    raise ValueError('unknown expression')
+                stack.append((node, 2))
+                for arg in reversed(node[1:]):
+                    stack.append((arg, 0))
+                continue
+            if state == 1:
+                #the condition of a '?' is done; evaluate only the chosen branch
+                stack.append((node, 3))
+                stack.append((node[2] if values.pop() else node[3], 0))
+                continue
+            if state == 2:
+                count = len(node) - 1
+                args = values[len(values) - count:]
+                del values[len(values) - count:]
+                head = node[0]
+                if head == 'print':
+                    value = print(*args)
+                elif count == 2 and head in BINOPS:
+                    value = BINOPS[head](*args)
+                else:
+                    value = UNOPS[head](*args)
+                values.append(value)
+            if id(node) not in self.impure:
+                memo[id(node)] = values[-1]
+        return values[0]
+
+    def stats(self):
+        unique = len(self.table)
+        looked_up = self.evaluations + self.cache_hits
+        return {
+            'nodes_seen': self.nodes_seen,
+            'unique_nodes': unique,
+            'shared_nodes': self.nodes_seen - unique,
+            'sharing_ratio': self.nodes_seen / unique if unique else 0.0,
+            'evaluations': self.evaluations,
+            'cache_hits': self.cache_hits,
+            'hit_rate': self.cache_hits / looked_up if looked_up else 0.0,
+        }
+
+
+
+'''Columnar evaluation runs one formula over a whole dataset instead of calling pl_eval per record. Symbols in the formula name columns - a dict of NumPy arrays, or a directory of <name>.npy files that are memory-mapped - and every operator is applied to whole arrays at once, with '?' becoming numpy.where (both branches are computed, then picked per row). With chunk_size the rows are processed in slices, so a dataset larger than RAM only ever has one slice of each column and of the intermediates in memory; out can then be a .npy path the result is written into. NumPy is only imported when this mode is used.'''
+
+import os
+
+def _numpy():
+    import numpy
+    return numpy
+
+
+def load_columns(path, names=None):
+    #memory-mapped, so opening a column reads nothing until its rows are used
+    np = _numpy()
+    if names is None:
+        names = [f[:-4] for f in sorted(os.listdir(path)) if f.endswith('.npy')]
+    columns = {}
+    for name in names:
+        file = os.path.join(path, name + '.npy')
+        if not os.path.exists(file):
+            raise ValueError(f"unknown column {name}: no {file}")
+        columns[name] = np.load(file, mmap_mode='r')
+    return columns
+
+
+def formula_symbols(node):
+    symbols = set()
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, str):
+            symbols.add(n)
+        elif not (len(n) == 2 and n[0] == 'val'):
+            stack.extend(n[1:])   #the head is the operator, not a column
+    return symbols
+
+
+def pl_eval_columns(node, columns, chunk_size=None, out=None):
+    np = _numpy()
+    symbols = formula_symbols(node)
+    if not isinstance(columns, dict):
+        columns = load_columns(columns, sorted(symbols) if symbols else None)
+    for name in symbols:
+        if name not in columns:
+            raise ValueError(f"unknown column {name}")
+    #a formula without columns still gets one value per row of the dataset
+    lengths = {len(columns[name]) for name in (symbols or columns)}
+    if len(lengths) > 1:
+        raise ValueError(f"columns differ in length: {sorted(lengths)}")
+    if not lengths:
+        raise ValueError("no columns to take the number of rows from")
+    rows = lengths.pop()
+    if chunk_size is None:
+        chunk_size = max(rows, 1)
+
+    result = None
+    for start in range(0, max(rows, 1), chunk_size):   #an empty dataset still yields an empty column
+        stop = min(start + chunk_size, rows)
+        chunk = {name: columns[name][start:stop] for name in symbols}
+        value = np.broadcast_to(_eval_columns(node, chunk, np), (stop - start,))   #a formula without columns is a constant
+        if result is None:
+            if isinstance(out, (str, os.PathLike)):
+                result = np.lib.format.open_memmap(out, mode='w+', dtype=value.dtype, shape=(rows,))
+            elif out is not None:
+                result = out
+            else:
+                result = np.empty(rows, dtype=value.dtype)
+        result[start:stop] = value
+    if isinstance(result, np.memmap):
+        result.flush()
+    return result
+
+
+def _eval_columns(root, chunk, np):
+    unops = {'-': operator.neg, 'not': np.logical_not}   #operator.not_ asks an array for one truth value
+    memo = {}   #id(node) -> array, so subtrees shared through SexprDAG are computed once per chunk
+    stack = [(root, False)]
+    values = []
+    while stack:
+        node, expanded = stack.pop()
+        if isinstance(node, str):
+            values.append(chunk[node])
+            continue
+        if not expanded:
+            if len(node) == 0:
+                raise ValueError("empty list")
+            if len(node) == 2 and node[0] == 'val':
+                values.append(node[1])
+                continue
+            if id(node) in memo:
+                values.append(memo[id(node)])
+                continue
+            head = node[0]
+            if head == 'print':
+                raise ValueError("print has no columnar form")
+            if not ((len(node) == 4 and head == '?') or (len(node) == 3 and head in BINOPS) or (len(node) == 2 and head in unops)):
+                raise ValueError('unknown expression')
+            stack.append((node, True))
+            for arg in reversed(node[1:]):
+                stack.append((arg, False))
+            continue
+        count = len(node) - 1
+        args = values[len(values) - count:]
+        del values[len(values) - count:]
+        head = node[0]
+        if head == '?':
+            value = np.where(*args)
+        elif count == 2:
+            value = BINOPS[head](*args)
+        else:
+            value = unops[head](*args)
+        memo[id(node)] = value
+        values.append(value)
+    return np.asarray(values[0])
+
+
+def test_eval():
+    def f(s):
+        return pl_eval(pl_parse(s))
+    print(f('1'))
+    print(f('(+ 1 3)') )
+    print(f('(? (lt 1 3) "yes" "no")'))
+    f('(print  "divij" 21 1)')
+
+if __name__ == "__main__":
+    test_eval()